@@ -3,12 +3,14 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from flask_compress import Compress
 from flask_login import LoginManager
 from config import Config
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
+compress = Compress()
 login_manager = LoginManager()
 
 def create_app(config_class=Config):
@@ -21,10 +23,14 @@ def create_app(config_class=Config):
     app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
     app.config.from_object(config_class)
     
+    from app.utils import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app)
+    compress.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
     
@@ -32,7 +38,7 @@ def create_app(config_class=Config):
     @login_manager.user_loader
     def load_user(user_id):
         from app.models.user import User
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
     
     from app.routes.main import bp as main_bp
     from app.routes.auth import bp as auth_bp
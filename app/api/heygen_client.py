@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import uuid
@@ -6,6 +7,9 @@ from typing import Dict, Optional, Any
 from flask import current_app
 import logging
 
+# Seconds to wait for a connection to HeyGen, separate from the per-call read timeouts
+CONNECT_TIMEOUT = 3
+
 class HeyGenClient:
     def __init__(self):
         self.api_key = current_app.config.get('HEYGEN_API_KEY')
@@ -16,6 +20,14 @@ class HeyGenClient:
             "Content-Type": "application/json"
         }
         self.logger = logging.getLogger(__name__)
+        # Keep-alive connection pool: the streaming endpoints are called several times per
+        # conversation, so reusing connections skips a TCP + TLS handshake on each call
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Default pool keeps only 10 connections per host; concurrent streaming sessions
+        # on a threaded worker would otherwise keep opening and discarding connections
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=50)
+        self.session.mount("https://", adapter)
     
     def create_video(self, script: str, avatar_id: str = None, voice_id: str = None) -> Dict:
         if not self.api_key:
@@ -53,11 +65,11 @@ class HeyGenClient:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/video/generate",
                 headers=self.headers,
                 json=payload,
-                timeout=30
+                timeout=(CONNECT_TIMEOUT, 30)
             )
             
             if response.status_code == 200:
@@ -82,11 +94,11 @@ class HeyGenClient:
             return {"error": "Missing API key or video ID"}
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/video/status",
                 headers=self.headers,
                 params={"video_id": video_id},
-                timeout=10
+                timeout=(CONNECT_TIMEOUT, 10)
             )
             
             if response.status_code == 200:
@@ -134,10 +146,10 @@ class HeyGenClient:
             return []
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/avatars",
                 headers=self.headers,
-                timeout=10
+                timeout=(CONNECT_TIMEOUT, 10)
             )
             
             if response.status_code == 200:
@@ -167,10 +179,10 @@ class HeyGenClient:
             return []
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/voices",
                 headers=self.headers,
-                timeout=10
+                timeout=(CONNECT_TIMEOUT, 10)
             )
             
             if response.status_code == 200:
@@ -272,10 +284,10 @@ class HeyGenClient:
             return {"error": "HeyGen API key not configured"}
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.streaming_url}/streaming.create_token",
                 headers={"x-api-key": self.api_key},
-                timeout=30
+                timeout=(CONNECT_TIMEOUT, 30)
             )
             
             if response.status_code == 200:
@@ -319,11 +331,11 @@ class HeyGenClient:
         session_config = {**default_config, **config}
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.streaming_url}/streaming.start",
                 headers=self.headers,
                 json=session_config,
-                timeout=30
+                timeout=(CONNECT_TIMEOUT, 30)
             )
             
             if response.status_code == 200:
@@ -361,11 +373,11 @@ class HeyGenClient:
             payload.update(session_info)
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.streaming_url}/streaming.task",
                 headers=self.headers,
                 json=payload,
-                timeout=30
+                timeout=(CONNECT_TIMEOUT, 30)
             )
             
             if response.status_code == 200:
@@ -390,11 +402,11 @@ class HeyGenClient:
             return {"error": "Missing API key or session ID"}
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.streaming_url}/streaming.stop",
                 headers=self.headers,
                 json={"session_id": session_id},
-                timeout=30
+                timeout=(CONNECT_TIMEOUT, 30)
             )
             
             if response.status_code == 200:
@@ -417,11 +429,11 @@ class HeyGenClient:
             return {"error": "Missing API key or session ID"}
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.streaming_url}/streaming.info",
                 headers=self.headers,
                 params={"session_id": session_id},
-                timeout=10
+                timeout=(CONNECT_TIMEOUT, 10)
             )
             
             if response.status_code == 200:
@@ -1,6 +1,6 @@
 from openai import OpenAI
-import json
-from typing import Dict, List, Optional
+import orjson
+from typing import Dict, Iterator, List, Optional
 from flask import current_app
 
 class OpenAIClient:
@@ -31,14 +31,31 @@ class OpenAIClient:
             
             # Try to parse as JSON if it looks like JSON
             try:
-                return json.loads(content)
-            except json.JSONDecodeError:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
                 return {"content": content}
                 
         except Exception as e:
             current_app.logger.error(f"OpenAI API error: {str(e)}")
             return {"error": "Failed to generate content", "details": str(e)}
     
+    def stream_content(self, messages: List[Dict], model: str = "gpt-3.5-turbo", max_tokens: int = 1000, temperature: float = 0.7) -> Iterator[str]:
+        """Yield completion text as it is generated; yields nothing if no API key is configured"""
+        if not self.client:
+            return
+        
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        )
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
     def generate_questions(self, content: str, num_questions: int = 5, difficulty: str = "intermediate") -> List[Dict]:
         prompt = f"""
         Create {num_questions} educational questions based on this content for {difficulty} level students (ages 16-20):
@@ -60,7 +77,7 @@ class OpenAIClient:
         try:
             response = self.generate_content(prompt)
             if isinstance(response, dict) and "content" in response:
-                return json.loads(response["content"])
+                return orjson.loads(response["content"])
             return response if isinstance(response, list) else []
         except:
             return []
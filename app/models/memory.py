@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import Text, cast, or_, text, update
 from app import db
 
 class StudentMemoryBoard(db.Model):
@@ -11,15 +12,16 @@ class StudentMemoryBoard(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False, unique=True)
 
-    # Compressed module-specific memory (JSON format)
-    reading_memory = db.Column(db.JSON, default=dict)
-    listening_memory = db.Column(db.JSON, default=dict)
-    speaking_memory = db.Column(db.JSON, default=dict)
-    writing_memory = db.Column(db.JSON, default=dict)
-    conversation_memory = db.Column(db.JSON, default=dict)
+    # Compressed module-specific memory (JSON format); rows created before these columns became
+    # NOT NULL may still hold NULL until backfill_empty_memories() has run
+    reading_memory = db.Column(db.JSON, default=dict, server_default=text("'{}'"), nullable=False)
+    listening_memory = db.Column(db.JSON, default=dict, server_default=text("'{}'"), nullable=False)
+    speaking_memory = db.Column(db.JSON, default=dict, server_default=text("'{}'"), nullable=False)
+    writing_memory = db.Column(db.JSON, default=dict, server_default=text("'{}'"), nullable=False)
+    conversation_memory = db.Column(db.JSON, default=dict, server_default=text("'{}'"), nullable=False)
 
     # Cross-module insights
-    overall_patterns = db.Column(db.JSON, default=dict)  # Common issues across modules
+    overall_patterns = db.Column(db.JSON, default=dict, server_default=text("'{}'"), nullable=False)  # Common issues across modules
 
     # Compression tracking
     reading_last_compressed_at = db.Column(db.DateTime)
@@ -38,6 +40,31 @@ class StudentMemoryBoard(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    MEMORY_COLUMNS = (
+        'reading_memory', 'listening_memory', 'speaking_memory',
+        'writing_memory', 'conversation_memory', 'overall_patterns'
+    )
+
+    @classmethod
+    def backfill_empty_memories(cls) -> int:
+        """Replace NULL (or JSON null) memory columns with an empty object.
+
+        db.create_all() does not alter existing tables, so rows written before the
+        columns became NOT NULL keep their NULLs until this runs.
+        Returns the number of column values updated.
+        """
+        updated = 0
+        for name in cls.MEMORY_COLUMNS:
+            column = getattr(cls, name)
+            result = db.session.execute(
+                update(cls)
+                .where(or_(column.is_(None), cast(column, Text) == 'null'))
+                .values({column: {}})
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        return updated
+
 
 class ReadingMemoryInsight(db.Model):
     """
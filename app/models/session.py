@@ -1,5 +1,10 @@
+import operator
+import uuid
 from datetime import datetime
+from sqlalchemy import func, update
+from sqlalchemy.orm import validates
 from app import db
+from app.models.types import MutableTextArray
 
 class LearningSession(db.Model):
     __tablename__ = 'learning_sessions'
@@ -21,6 +26,11 @@ class LearningSession(db.Model):
     previous_session_id = db.Column(db.Integer, db.ForeignKey('learning_sessions.id'))
     context_data = db.Column(db.JSON)  # Store conversation/learning context
     
+    __table_args__ = (
+        db.Index('ix_learnsess_student_completed', 'student_id', 'is_completed', 'completed_at'),
+        db.Index('ix_learnsess_student_module_started', 'student_id', 'module_type', 'started_at'),
+    )
+    
     def complete_session(self, score=None, data=None):
         self.completed_at = datetime.utcnow()
         self.is_completed = True
@@ -49,6 +59,7 @@ class ConversationSession(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(100), unique=True, nullable=False)  # HeyGen session ID
+    session_uuid = db.Column(db.Uuid, unique=True, index=True)  # Typed copy of session_id when it is a UUID
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
     learning_session_id = db.Column(db.Integer, db.ForeignKey('learning_sessions.id'), nullable=True)
     
@@ -66,7 +77,11 @@ class ConversationSession(db.Model):
     avatar_words_count = db.Column(db.Integer, default=0)
     
     # Conversation content
-    conversation_transcript = db.Column(db.JSON)  # Full conversation history
+    # Archived copy of the turns, written once on completion. Not mutation-tracked:
+    # always reassign it, in-place edits are not persisted.
+    conversation_transcript = db.Column(db.JSON)
+    turns = db.relationship('ConversationTurn', backref='conversation_session', lazy='dynamic',
+                            order_by='ConversationTurn.turn_number')
     
     # Performance scores (0-100)
     fluency_score = db.Column(db.Float)
@@ -85,15 +100,45 @@ class ConversationSession(db.Model):
     complex_responses = db.Column(db.Integer, default=0)
     
     # Learning insights
-    future_recommendations = db.Column(db.JSON)  # Array of improvement suggestions
-    achievements = db.Column(db.JSON)  # Array of achievements earned
-    improvement_areas = db.Column(db.JSON)  # Array of areas needing work
+    future_recommendations = db.Column(MutableTextArray)  # Array of improvement suggestions
+    achievements = db.Column(MutableTextArray)  # Array of achievements earned
+    improvement_areas = db.Column(MutableTextArray)  # Array of areas needing work
+    
+    __table_args__ = (db.Index('ix_convsess_student_active', 'student_id', 'is_active'),)
+    
+    @validates('session_id')
+    def _sync_session_uuid(self, key, value):
+        """Keep session_uuid in step with session_id"""
+        self.session_uuid = self._parse_uuid(value)
+        return value
+    
+    @staticmethod
+    def _parse_uuid(value):
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            return None
+    
+    @classmethod
+    def get_by_session_id(cls, session_id: str):
+        """Look up a session by its HeyGen id, using the UUID index when possible.
+
+        Rows written before session_uuid existed have it NULL, so a UUID miss
+        falls back to the session_id column.
+        """
+        session_uuid = cls._parse_uuid(session_id)
+        if session_uuid is not None:
+            session = cls.query.filter_by(session_uuid=session_uuid).first()
+            if session is not None:
+                return session
+        return cls.query.filter_by(session_id=session_id).first()
     
     def complete_session(self, analytics_data: dict = None):
         """Complete the conversation session with analytics"""
         self.completed_at = datetime.utcnow()
         self.is_active = False
         self.duration_seconds = int((self.completed_at - self.started_at).total_seconds())
+        self.conversation_transcript = self.get_transcript()
         
         if analytics_data:
             # Update scores from analytics
@@ -111,43 +156,106 @@ class ConversationSession(db.Model):
             self.achievements = analytics_data.get('achievements', [])
             self.improvement_areas = analytics_data.get('improvement_areas', [])
     
+    # Engagement metrics, the value at which each one counts as fully engaged, and its weight
+    _ENGAGEMENT_CAPS = (
+        ('questions_asked', 10, 1.0),  # Questions show engagement
+        ('complex_responses', 7, 1.0),  # Complex responses show effort
+        ('total_words_spoken', 500, 1.0),  # Speaking volume
+        ('conversation_flow_score', 100, 0.5)  # Flow indicates engagement
+    )
+    _ENGAGEMENT_WEIGHT = sum(weight for _, _, weight in _ENGAGEMENT_CAPS)
+    
     def _calculate_engagement_level(self, analytics_data: dict) -> int:
-        """Calculate overall engagement level from various metrics"""
-        engagement_factors = [
-            analytics_data.get('questions_asked', 0) * 10,  # Questions show engagement
-            analytics_data.get('complex_responses', 0) * 15,  # Complex responses show effort
-            min(100, analytics_data.get('total_words_spoken', 0) / 5),  # Speaking volume
-            analytics_data.get('conversation_flow_score', 0) * 0.5  # Flow indicates engagement
-        ]
-        return min(100, int(sum(engagement_factors)))
-    
-    def add_conversation_turn(self, user_message: str, ai_response: str, analytics: dict = None):
-        """Add a conversation turn to the transcript"""
-        if not self.conversation_transcript:
-            self.conversation_transcript = []
+        """Calculate overall engagement level (0-100) as the weighted mean of the scaled metrics"""
+        weighted = sum(
+            weight * min(max(analytics_data.get(key) or 0, 0), cap) / cap
+            for key, cap, weight in self._ENGAGEMENT_CAPS
+        )
+        return int(100 * weighted / self._ENGAGEMENT_WEIGHT)
+    
+    def _increment_counters(self, turns: int, student_words: int, avatar_words: int) -> int:
+        """Atomically bump the turn/word counters in SQL and return the new total_turns"""
+        if self.id is None:
+            db.session.add(self)
+            db.session.flush()
         
-        turn_data = {
-            'turn_number': len(self.conversation_transcript) + 1,
-            'timestamp': datetime.utcnow().isoformat(),
-            'user_message': user_message,
-            'ai_response': ai_response,
-            'user_word_count': len(user_message.split()),
-            'ai_word_count': len(ai_response.split())
-        }
+        total_turns = db.session.execute(
+            update(ConversationSession)
+            .where(ConversationSession.id == self.id)
+            .values(
+                total_turns=func.coalesce(ConversationSession.total_turns, 0) + turns,
+                student_words_count=func.coalesce(ConversationSession.student_words_count, 0) + student_words,
+                avatar_words_count=func.coalesce(ConversationSession.avatar_words_count, 0) + avatar_words
+            )
+            .returning(ConversationSession.total_turns)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        db.session.expire(self, ['total_turns', 'student_words_count', 'avatar_words_count'])
+        return total_turns
+    
+    def add_conversation_turn(self, user_message: str, ai_response: str, analytics: dict = None,
+                              now: datetime = None):
+        """Add a conversation turn as a ConversationTurn row (one INSERT per turn).
+        
+        Bulk callers can pass one ``now`` for the whole batch instead of reading the clock per turn.
+        """
+        user_word_count = len(user_message.split())
+        ai_word_count = len(ai_response.split())
+        
+        turn = ConversationTurn(
+            turn_number=self._increment_counters(1, user_word_count, ai_word_count),
+            timestamp=now or datetime.utcnow(),
+            user_message=user_message,
+            ai_response=ai_response,
+            user_word_count=user_word_count,
+            ai_word_count=ai_word_count
+        )
         
         if analytics:
-            turn_data['analytics'] = analytics
+            turn.analytics = analytics
+            turn.pronunciation_score = analytics.get('pronunciation_score')
+            turn.response_time_seconds = analytics.get('response_time_seconds')
         
-        self.conversation_transcript.append(turn_data)
+        self.turns.append(turn)
+    
+    def flush_turns(self, turns: list, batch_size: int = 1000, now: datetime = None):
+        """Bulk-insert many turns (e.g. a finished streaming conversation) with one executemany per batch"""
+        timestamp = now or datetime.utcnow()
+        rows = []
+        for turn in turns:
+            user_message = turn.get('user_message') or ''
+            ai_response = turn.get('ai_response') or ''
+            analytics = turn.get('analytics') or {}
+            rows.append({
+                'timestamp': turn.get('timestamp') or timestamp,
+                'user_message': user_message,
+                'ai_response': ai_response,
+                'user_word_count': len(user_message.split()),
+                'ai_word_count': len(ai_response.split()),
+                'pronunciation_score': analytics.get('pronunciation_score'),
+                'response_time_seconds': analytics.get('response_time_seconds'),
+                'analytics': turn.get('analytics')
+            })
+        
+        total_turns = self._increment_counters(
+            len(rows),
+            sum(r['user_word_count'] for r in rows),
+            sum(r['ai_word_count'] for r in rows)
+        )
+        for turn_number, row in enumerate(rows, start=total_turns - len(rows) + 1):
+            row['conversation_session_id'] = self.id
+            row['turn_number'] = turn_number
         
-        # Update counters
-        self.total_turns += 1
-        self.student_words_count += len(user_message.split())
-        self.avatar_words_count += len(ai_response.split())
+        for i in range(0, len(rows), batch_size):
+            db.session.execute(ConversationTurn.__table__.insert(), rows[i:i + batch_size])
+    
+    def get_transcript(self) -> list:
+        """Build the conversation transcript from the stored turns"""
+        return [turn.to_dict() for turn in self.turns]
     
     def get_conversation_summary(self) -> dict:
         """Get a summary of the conversation"""
-        if not self.conversation_transcript:
+        if not self.total_turns:
             return {}
         
         return {
@@ -160,38 +268,26 @@ class ConversationSession(db.Model):
             'engagement_level': self.engagement_level
         }
     
+    # Serialized by to_dict, in output order
+    _DICT_FIELDS = (
+        'id', 'session_id', 'student_id', 'conversation_topic', 'platform',
+        'started_at', 'completed_at', 'duration_seconds', 'is_active',
+        'total_turns', 'student_words_count', 'avatar_words_count',
+        'fluency_score', 'pronunciation_score', 'logical_flow_score',
+        'vocabulary_complexity', 'engagement_level', 'response_appropriateness',
+        'grammar_accuracy', 'questions_asked', 'complex_responses', 'topic_adherence',
+        'achievements', 'improvement_areas', 'future_recommendations'
+    )
+    _dict_values = operator.attrgetter(*_DICT_FIELDS)
+    
     def to_dict(self, include_transcript: bool = False):
         """Convert to dictionary"""
-        data = {
-            'id': self.id,
-            'session_id': self.session_id,
-            'student_id': self.student_id,
-            'conversation_topic': self.conversation_topic,
-            'platform': self.platform,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'duration_seconds': self.duration_seconds,
-            'is_active': self.is_active,
-            'total_turns': self.total_turns,
-            'student_words_count': self.student_words_count,
-            'avatar_words_count': self.avatar_words_count,
-            'fluency_score': self.fluency_score,
-            'pronunciation_score': self.pronunciation_score,
-            'logical_flow_score': self.logical_flow_score,
-            'vocabulary_complexity': self.vocabulary_complexity,
-            'engagement_level': self.engagement_level,
-            'response_appropriateness': self.response_appropriateness,
-            'grammar_accuracy': self.grammar_accuracy,
-            'questions_asked': self.questions_asked,
-            'complex_responses': self.complex_responses,
-            'topic_adherence': self.topic_adherence,
-            'achievements': self.achievements,
-            'improvement_areas': self.improvement_areas,
-            'future_recommendations': self.future_recommendations
-        }
+        data = dict(zip(self._DICT_FIELDS, self._dict_values(self)))
+        data['started_at'] = self.started_at.isoformat() if self.started_at else None
+        data['completed_at'] = self.completed_at.isoformat() if self.completed_at else None
         
         if include_transcript:
-            data['conversation_transcript'] = self.conversation_transcript
+            data['conversation_transcript'] = self.conversation_transcript or self.get_transcript()
         
         return data
 
@@ -215,11 +311,14 @@ class ConversationTurn(db.Model):
     response_time_seconds = db.Column(db.Float)  # Time to respond
     complexity_score = db.Column(db.Integer)  # Message complexity
     sentiment_score = db.Column(db.Float)  # Emotional tone
+    analytics = db.Column(db.JSON)  # Raw analytics payload supplied with the turn
     
     # Audio data (if available)
     audio_file_path = db.Column(db.String(255))  # Path to stored audio
     audio_duration_seconds = db.Column(db.Float)
     
+    __table_args__ = (db.Index('ix_convturn_session_turn', 'conversation_session_id', 'turn_number'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -234,5 +333,6 @@ class ConversationTurn(db.Model):
             'response_time_seconds': self.response_time_seconds,
             'complexity_score': self.complexity_score,
             'sentiment_score': self.sentiment_score,
-            'audio_duration_seconds': self.audio_duration_seconds
+            'audio_duration_seconds': self.audio_duration_seconds,
+            'analytics': self.analytics
         }
\ No newline at end of file
@@ -1,5 +1,8 @@
 from datetime import datetime
+from sqlalchemy import and_, case, func, update
+from sqlalchemy.ext.hybrid import hybrid_property
 from app import db
+from app.models.types import TextArray, IntegerArray
 from typing import Dict, List, Optional
 import json
 
@@ -51,7 +54,18 @@ class SpeakingSession(db.Model):
     student = db.relationship('Student', backref='speaking_sessions')
     session = db.relationship('LearningSession', backref='speaking_session_data')
 
+    __table_args__ = (
+        db.Index('ix_speaksess_student_type', 'student_id', 'practice_type'),
+        db.Index('ix_speaksess_student_created', 'student_id', 'created_at'),
+    )
+
     def to_dict(self) -> Dict:
+        data = self.to_dict_raw()
+        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+    def to_dict_raw(self) -> Dict:
+        """Same as to_dict but with datetime objects, for orjson-encoded responses"""
         return {
             'id': self.id,
             'student_id': self.student_id,
@@ -68,16 +82,33 @@ class SpeakingSession(db.Model):
             'problem_words': self.problem_words,
             'ai_feedback': self.ai_feedback,
             'improvement_suggestions': self.improvement_suggestions,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
-    def calculate_overall_score(self) -> float:
-        """Calculate overall speaking performance score"""
+    @hybrid_property
+    def overall_score(self) -> float:
+        """Overall speaking performance score; also usable in queries, e.g. func.avg(SpeakingSession.overall_score)"""
         scores = [self.pronunciation_score, self.accuracy_score, self.fluency_score, self.completeness_score]
         if self.prosody_score > 0:  # Include prosody for sentences and paragraphs
             scores.append(self.prosody_score)
         return sum(scores) / len(scores) if scores else 0
 
+    @overall_score.expression
+    def overall_score(cls):
+        has_prosody = func.coalesce(cls.prosody_score, 0) > 0
+        total = (
+            func.coalesce(cls.pronunciation_score, 0)
+            + func.coalesce(cls.accuracy_score, 0)
+            + func.coalesce(cls.fluency_score, 0)
+            + func.coalesce(cls.completeness_score, 0)
+            + case((has_prosody, cls.prosody_score), else_=0)
+        )
+        return total / case((has_prosody, 5.0), else_=4.0)
+
+    def calculate_overall_score(self) -> float:
+        """Calculate overall speaking performance score"""
+        return self.overall_score
+
 
 class SpeakingPracticeContent(db.Model):
     """Pre-defined content for speaking practice"""
@@ -141,37 +172,102 @@ class WordPronunciationHistory(db.Model):
     average_score = db.Column(db.Float, default=0)
 
     # Phoneme-level tracking
-    problem_phonemes = db.Column(db.JSON)  # List of consistently problematic phonemes
+    problem_phonemes = db.Column(TextArray)  # List of consistently problematic phonemes
 
     # Progress tracking
     is_mastered = db.Column(db.Boolean, default=False)  # Score consistently > 85
     first_attempt_date = db.Column(db.DateTime, default=datetime.utcnow)
     last_practice_date = db.Column(db.DateTime, default=datetime.utcnow)
     mastery_date = db.Column(db.DateTime)
+    needs_recalc = db.Column(db.Boolean, default=True, index=True)  # Stats pending batch recalculation
 
     # Relationship
     student = db.relationship('Student', backref='word_pronunciation_history')
 
-    def update_with_new_attempt(self, new_score: float, phoneme_issues: List = None):
-        """Update history with new pronunciation attempt"""
-        self.attempts += 1
-        self.latest_score = new_score
-        self.best_score = max(self.best_score, new_score)
-        self.average_score = ((self.average_score * (self.attempts - 1)) + new_score) / self.attempts
-        self.last_practice_date = datetime.utcnow()
-
-        # Check mastery (3 consecutive attempts > 85)
-        if new_score >= 85:
-            if self.attempts >= 3 and self.average_score >= 85:
-                self.is_mastered = True
-                self.mastery_date = datetime.utcnow()
+    __table_args__ = (db.Index('ix_wordhist_student_mastered', 'student_id', 'is_mastered'),)
+
+    def update_with_new_attempt(self, new_score: float, phoneme_issues: List = None,
+                                now: Optional[datetime] = None):
+        """Record a new pronunciation attempt and flag the word for recalculation.
+
+        Only the per-attempt fields are written here; attempts, best/average score and
+        mastery are recomputed by recalculate_flagged(), which the caller runs for the
+        word after adding its speaking session to the same transaction.
+        Bulk callers can pass one ``now`` for the whole batch instead of reading the clock per word.
+        """
+        cls = WordPronunciationHistory
+        values = {
+            cls.latest_score: new_score,
+            cls.last_practice_date: now or datetime.utcnow(),
+            cls.needs_recalc: True
+        }
 
         # Update problem phonemes
         if phoneme_issues:
-            current_issues = self.problem_phonemes or []
-            self.problem_phonemes = list(set(current_issues + phoneme_issues))
+            # Sorted so an unchanged set of phonemes produces an identical value
+            seen = set(self.problem_phonemes or ())
+            seen.update(phoneme_issues)
+            values[cls.problem_phonemes] = sorted(seen)
+
+        db.session.query(cls).filter_by(id=self.id).update(values, synchronize_session=False)
+        db.session.expire(self, [column.key for column in values])
+
+    @classmethod
+    def recalculate_flagged(cls, now: Optional[datetime] = None,
+                            student_id: Optional[int] = None, word: Optional[str] = None) -> int:
+        """Recompute statistics of flagged words from their word-practice sessions.
+
+        Pass student_id and word to recompute one history row right after an attempt;
+        without them every flagged row is recomputed.
+        Returns the number of history rows updated.
+        """
+        now = now or datetime.utcnow()
+        stats = db.session.query(
+            cls.id,
+            cls.latest_score,
+            cls.is_mastered,
+            func.count(SpeakingSession.id),
+            func.max(SpeakingSession.pronunciation_score),
+            func.avg(SpeakingSession.pronunciation_score)
+        ).join(SpeakingSession, and_(
+            SpeakingSession.student_id == cls.student_id,
+            SpeakingSession.practice_content == cls.word,
+            SpeakingSession.practice_type == 'word'
+        )).filter(
+            cls.needs_recalc.is_(True)
+        )
+        if student_id is not None:
+            stats = stats.filter(cls.student_id == student_id)
+        if word is not None:
+            stats = stats.filter(cls.word == word)
+        stats = stats.group_by(cls.id, cls.latest_score, cls.is_mastered).all()
+
+        updates = []
+        for history_id, latest_score, is_mastered, attempts, best_score, average_score in stats:
+            row = {
+                'id': history_id,
+                'attempts': attempts,
+                'best_score': best_score or 0,
+                'average_score': average_score or 0,
+                'needs_recalc': False
+            }
+            # Check mastery (3 consecutive attempts > 85)
+            if not is_mastered and latest_score >= 85 and attempts >= 3 and row['average_score'] >= 85:
+                row['is_mastered'] = True
+                row['mastery_date'] = now
+            updates.append(row)
+
+        if updates:
+            db.session.execute(update(cls), updates)
+        return len(updates)
 
     def to_dict(self) -> Dict:
+        data = self.to_dict_raw()
+        data['last_practice_date'] = self.last_practice_date.isoformat() if self.last_practice_date else None
+        return data
+
+    def to_dict_raw(self) -> Dict:
+        """Same as to_dict but with datetime objects, for orjson-encoded responses"""
         return {
             'word': self.word,
             'attempts': self.attempts,
@@ -180,7 +276,7 @@ class WordPronunciationHistory(db.Model):
             'average_score': self.average_score,
             'is_mastered': self.is_mastered,
             'problem_phonemes': self.problem_phonemes,
-            'last_practice_date': self.last_practice_date.isoformat() if self.last_practice_date else None
+            'last_practice_date': self.last_practice_date
         }
 
 
@@ -194,8 +290,8 @@ class SpeakingChallenge(db.Model):
 
     # Challenge type and content
     challenge_type = db.Column(db.String(50))  # daily, weekly, exam_prep
-    practice_types = db.Column(db.JSON)  # ['word', 'sentence', 'paragraph']
-    content_ids = db.Column(db.JSON)  # List of SpeakingPracticeContent IDs
+    practice_types = db.Column(TextArray)  # ['word', 'sentence', 'paragraph']
+    content_ids = db.Column(IntegerArray)  # List of SpeakingPracticeContent IDs
 
     # Requirements
     minimum_score = db.Column(db.Float, default=75)
@@ -0,0 +1,11 @@
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.mutable import MutableList
+from app import db
+
+# Flat list columns: native arrays on PostgreSQL, JSON on the SQLite development database
+TextArray = ARRAY(db.Text).with_variant(db.JSON, 'sqlite')
+IntegerArray = ARRAY(db.Integer).with_variant(db.JSON, 'sqlite')
+
+# Same as TextArray, but in-place changes (append, remove, ...) mark the column dirty.
+# Only use this for small lists that are edited in place; anything else should be reassigned.
+MutableTextArray = MutableList.as_mutable(ARRAY(db.Text).with_variant(db.JSON, 'sqlite'))
@@ -1,36 +1,46 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from passlib.hash import argon2
 from app import db
+from app.models.types import TextArray
+
+# Default argon2id cost for new password hashes; callers can override per call
+password_hasher = argon2.using(rounds=3, memory_cost=65536, parallelism=4)
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
+    password_hash = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     user_type = db.Column(db.String(20), nullable=False)
     
     __mapper_args__ = {
         'polymorphic_identity': 'user',
-        'polymorphic_on': user_type
+        'polymorphic_on': user_type,
+        'with_polymorphic': '*'  # Join student/teacher tables so subclass columns load in one SELECT
     }
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, **cost):
+        hasher = password_hasher.using(**cost) if cost else password_hasher
+        self.password_hash = hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not argon2.identify(self.password_hash):
+            # Hashes created with werkzeug before the switch to argon2
+            return check_password_hash(self.password_hash, password)
+        return argon2.verify(password, self.password_hash)
 
 class Teacher(User):
     id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
     institution_name = db.Column(db.String(200))
-    subjects_taught = db.Column(db.JSON)  # JSON array of subjects
+    subjects_taught = db.Column(TextArray)  # Array of subjects
     education_levels = db.Column(db.String(100))  # high school, undergraduate, graduate
     specialization = db.Column(db.String(100))  # TOEFL prep, academic writing, etc.
-    students = db.relationship('Student', backref='teacher', lazy='dynamic', foreign_keys='Student.teacher_id')
+    students = db.relationship('Student', back_populates='teacher', foreign_keys='Student.teacher_id')
     custom_content = db.relationship('CustomContent', backref='teacher', lazy='dynamic')
     
     __mapper_args__ = {
@@ -43,16 +53,20 @@ class Student(User):
     education_level = db.Column(db.String(20))  # high school, undergraduate, graduate
     major_field = db.Column(db.String(100))  # Academic major or area of study
     english_proficiency_level = db.Column(db.String(20))  # beginner, intermediate, advanced
-    target_exams = db.Column(db.JSON)  # JSON array of target exams (TOEFL, IELTS, GRE, etc.)
+    target_exams = db.Column(TextArray)  # Array of target exams (TOEFL, IELTS, GRE, etc.)
     location = db.Column(db.String(100))  # City/region in China mainland
     teacher_id = db.Column(db.Integer, db.ForeignKey('teacher.id'), nullable=True)  # Optional
+    teacher = db.relationship('Teacher', back_populates='students', foreign_keys=[teacher_id])
     
-    sessions = db.relationship('LearningSession', backref='student', lazy='dynamic')
-    progress = db.relationship('Progress', backref='student', lazy='dynamic')
-    reading_sessions = db.relationship('ReadingSession', backref='student', lazy='dynamic')
-    vocabulary_interactions = db.relationship('VocabularyInteraction', backref='student', lazy='dynamic')
-    reading_progress = db.relationship('ReadingProgress', backref='student', lazy='dynamic')
+    # Plain lazy collections (not 'dynamic') so they can be batch-loaded with selectinload()
+    sessions = db.relationship('LearningSession', backref='student')
+    progress = db.relationship('Progress', backref='student')
+    reading_sessions = db.relationship('ReadingSession', backref='student')
+    vocabulary_interactions = db.relationship('VocabularyInteraction', backref='student')
+    reading_progress = db.relationship('ReadingProgress', backref='student')
     
     __mapper_args__ = {
         'polymorphic_identity': 'student'
-    }
\ No newline at end of file
+    }
+    
+    __table_args__ = (db.Index('ix_student_target_exams_gin', 'target_exams', postgresql_using='gin'),)
@@ -1,54 +1,82 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+import logging
+from typing import List, Optional
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, or_, select, update
 from werkzeug.security import check_password_hash
 from app import db
-from app.models.user import User, Student, Teacher
+from app.models.user import User, Student, Teacher, password_hasher
+from app.utils import current_user, current_user_id, role_required
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('auth', __name__)
 
+# Verified against when the username does not exist, so unknown and known
+# usernames cost the same argon2 verification and cannot be told apart by timing
+_DUMMY_HASH = password_hasher.hash('dummy-password')
+
+class RegistrationPayload(BaseModel):
+    """Registration body, parsed and validated from raw JSON in one pass"""
+    username: str
+    email: str
+    password: str
+    user_type: str
+    # Student fields
+    age: Optional[int] = None
+    education_level: Optional[str] = None
+    major_field: Optional[str] = None
+    english_proficiency_level: Optional[str] = None
+    target_exams: Optional[List[str]] = None
+    location: Optional[str] = None
+    teacher_id: Optional[int] = None
+    # Teacher fields
+    institution_name: Optional[str] = None
+    education_levels: Optional[str] = None
+    specialization: Optional[str] = None
+
+REGISTRATION_FIELDS = {
+    'student': {'username', 'email', 'age', 'education_level', 'major_field',
+                'english_proficiency_level', 'target_exams', 'location', 'teacher_id'},
+    'teacher': {'username', 'email', 'institution_name', 'education_levels', 'specialization'}
+}
+
 @bp.route('/register', methods=['POST'])
 def register():
-    data = request.get_json()
-    
-    # Validate required fields
-    required_fields = ['username', 'email', 'password', 'user_type']
-    if not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    # Check if user already exists
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
+    try:
+        data = RegistrationPayload.model_validate_json(request.get_data())
+    except ValidationError as e:
+        # include_url/include_context off: only the error type and field are needed
+        errors = e.errors(include_url=False, include_context=False)
+        missing = sorted(error['loc'][0] for error in errors if error['type'] == 'missing')
+        if missing:
+            return jsonify({'error': f"Missing required fields: {', '.join(missing)}"}), 400
+        return jsonify({'error': 'Invalid registration data'}), 400
     
-    if User.query.filter_by(email=data['email']).first():
+    # Check if user already exists (one query for both unique fields)
+    existing = db.session.execute(
+        select(User.username, User.email)
+        .where(or_(User.username == data.username, User.email == data.email))
+        .order_by((User.username == data.username).desc())  # Report username clashes first
+        .limit(1)
+    ).first()
+    if existing:
+        if existing.username == data.username:
+            return jsonify({'error': 'Username already exists'}), 400
         return jsonify({'error': 'Email already exists'}), 400
     
     try:
-        user_type = data['user_type'].lower()
+        user_type = data.user_type.lower()
         
         if user_type == 'student':
-            user = Student(
-                username=data['username'],
-                email=data['email'],
-                age=data.get('age'),
-                education_level=data.get('education_level'),
-                major_field=data.get('major_field'),
-                english_proficiency_level=data.get('english_proficiency_level'),
-                target_exams=data.get('target_exams'),
-                location=data.get('location'),
-                teacher_id=data.get('teacher_id')
-            )
+            user = Student(**data.model_dump(include=REGISTRATION_FIELDS['student']))
         elif user_type == 'teacher':
-            user = Teacher(
-                username=data['username'],
-                email=data['email'],
-                institution_name=data.get('institution_name'),
-                education_levels=data.get('education_levels'),
-                specialization=data.get('specialization')
-            )
+            user = Teacher(**data.model_dump(include=REGISTRATION_FIELDS['teacher']))
         else:
             return jsonify({'error': 'Invalid user type'}), 400
         
-        user.set_password(data['password'])
+        user.set_password(data.password)
         db.session.add(user)
         db.session.commit()
         
@@ -58,9 +86,9 @@ def register():
             'user_type': user.user_type
         }), 201
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        current_app.logger.error(f"Registration error: {str(e)}")
+        logger.exception("Registration error")
         return jsonify({'error': 'Registration failed'}), 500
 
 @bp.route('/login', methods=['POST'])
@@ -72,7 +100,13 @@ def login():
     
     user = User.query.filter_by(username=data['username']).first()
     
-    if user and user.check_password(data['password']):
+    if user:
+        password_ok = user.check_password(data['password'])
+    else:
+        password_hasher.verify(data['password'], _DUMMY_HASH)
+        password_ok = False
+    
+    if password_ok:
         access_token = create_access_token(
             identity=str(user.id),
             additional_claims={
@@ -90,11 +124,45 @@ def login():
     
     return jsonify({'error': 'Invalid username or password'}), 401
 
+def _serialize_student(user, profile_data):
+    profile_data.update({
+        'age': user.age,
+        'education_level': user.education_level,
+        'major_field': user.major_field,
+        'english_proficiency_level': user.english_proficiency_level,
+        'target_exams': user.target_exams,
+        'location': user.location,
+        'teacher_id': user.teacher_id
+    })
+
+def _serialize_teacher(user, profile_data):
+    profile_data.update({
+        'institution_name': user.institution_name,
+        'education_levels': user.education_levels,
+        'specialization': user.specialization,
+        'student_count': db.session.query(func.count(Student.id)).filter_by(teacher_id=user.id).scalar()
+    })
+
+# Per user_type profile handling, looked up by key instead of isinstance checks
+PROFILE_SERIALIZERS = {
+    'student': _serialize_student,
+    'teacher': _serialize_teacher
+}
+
+PROFILE_UPDATABLE_FIELDS = {
+    'student': ('age', 'education_level', 'major_field', 'english_proficiency_level', 'target_exams', 'location'),
+    'teacher': ('institution_name', 'education_levels', 'specialization')
+}
+
+PROFILE_MODELS = {
+    'student': Student,
+    'teacher': Teacher
+}
+
 @bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    user = current_user()
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -104,81 +172,69 @@ def get_profile():
         'username': user.username,
         'email': user.email,
         'user_type': user.user_type,
-        'created_at': user.created_at.isoformat()
+        'created_at': user.created_at
     }
     
     # Add specific data based on user type
-    if isinstance(user, Student):
-        profile_data.update({
-            'age': user.age,
-            'education_level': user.education_level,
-            'major_field': user.major_field,
-            'english_proficiency_level': user.english_proficiency_level,
-            'target_exams': user.target_exams,
-            'location': user.location,
-            'teacher_id': user.teacher_id
-        })
-    elif isinstance(user, Teacher):
-        profile_data.update({
-            'institution_name': user.institution_name,
-            'education_levels': user.education_levels,
-            'specialization': user.specialization,
-            'student_count': user.students.count()
-        })
+    serializer = PROFILE_SERIALIZERS.get(user.user_type)
+    if serializer:
+        serializer(user, profile_data)
     
     return jsonify(profile_data), 200
 
 @bp.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Invalid profile data'}), 400
+    user_type = get_jwt().get('user_type')
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
-    data = request.get_json()
+    # Common fields plus the fields specific to the user type
+    changes = {
+        field: data[field]
+        for field in ('email',) + PROFILE_UPDATABLE_FIELDS.get(user_type, ())
+        if field in data
+    }
     
     try:
-        # Update common fields
-        if 'email' in data:
-            user.email = data['email']
+        # A single-field edit is one UPDATE on the owning table - no SELECT, no flush
+        if len(changes) == 1 and user_type in PROFILE_MODELS:
+            (field, value), = changes.items()
+            table = (User if field == 'email' else PROFILE_MODELS[user_type]).__table__
+            result = db.session.execute(
+                update(table).where(table.c.id == current_user_id()).values({field: value})
+            )
+            if result.rowcount == 0:
+                db.session.rollback()
+                return jsonify({'error': 'User not found'}), 404
+            db.session.commit()
+            return jsonify({'message': 'Profile updated successfully'}), 200
+        
+        user = current_user()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
         
-        # Update specific fields based on user type
-        if isinstance(user, Student):
-            if 'age' in data:
-                user.age = data['age']
-            if 'education_level' in data:
-                user.education_level = data['education_level']
-            if 'major_field' in data:
-                user.major_field = data['major_field']
-            if 'english_proficiency_level' in data:
-                user.english_proficiency_level = data['english_proficiency_level']
-            if 'target_exams' in data:
-                user.target_exams = data['target_exams']
-            if 'location' in data:
-                user.location = data['location']
-        elif isinstance(user, Teacher):
-            if 'institution_name' in data:
-                user.institution_name = data['institution_name']
-            if 'education_levels' in data:
-                user.education_levels = data['education_levels']
-            if 'specialization' in data:
-                user.specialization = data['specialization']
+        for field, value in changes.items():
+            setattr(user, field, value)
+        
+        # Skip the commit round-trip when nothing actually changed
+        if not db.session.is_modified(user):
+            return jsonify({'message': 'No changes'}), 200
         
         db.session.commit()
         return jsonify({'message': 'Profile updated successfully'}), 200
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        current_app.logger.error(f"Profile update error: {str(e)}")
+        logger.exception("Profile update error")
         return jsonify({'error': 'Profile update failed'}), 500
 
 @bp.route('/change-password', methods=['POST'])
 @jwt_required()
 def change_password():
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    user = current_user()
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -196,33 +252,27 @@ def change_password():
         db.session.commit()
         return jsonify({'message': 'Password changed successfully'}), 200
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        current_app.logger.error(f"Password change error: {str(e)}")
+        logger.exception("Password change error")
         return jsonify({'error': 'Password change failed'}), 500
 
 @bp.route('/students', methods=['GET'])
-@jwt_required()
+@role_required('teacher')
 def get_students():
     # For teachers to get their students
-    from flask_jwt_extended import get_jwt
-    claims = get_jwt()
-    
-    if claims.get('user_type') != 'teacher':
-        return jsonify({'error': 'Access denied - teachers only'}), 403
-    
-    teacher_id = int(get_jwt_identity())
-    students = Student.query.filter_by(teacher_id=teacher_id).all()
-    
-    students_data = []
-    for student in students:
-        students_data.append({
-            'id': student.id,
-            'username': student.username,
-            'age': student.age,
-            'education_level': student.education_level,
-            'english_proficiency_level': student.english_proficiency_level,
-            'created_at': student.created_at.isoformat()
-        })
-    
-    return jsonify({'students': students_data}), 200
\ No newline at end of file
+    teacher_id = g.user_id
+    # Only the listed columns are fetched; no Student instances are built
+    rows = db.session.execute(
+        select(
+            Student.id,
+            Student.username,
+            Student.age,
+            Student.education_level,
+            Student.english_proficiency_level,
+            Student.created_at
+        ).where(Student.teacher_id == teacher_id)
+    ).mappings().all()
+    
+    # The JSON provider encodes created_at natively
+    return jsonify({'students': [dict(row) for row in rows]}), 200
\ No newline at end of file
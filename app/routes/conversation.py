@@ -1,19 +1,86 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.conversation_service import ConversationService
-from app.api.openai_client import OpenAIClient
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required
+from werkzeug.exceptions import HTTPException
+from app.utils import METRICS, SingleFlight, cacheable_response, current_user_id
 import json
 import logging
+import functools
+from typing import Annotated
+from pydantic import BaseModel, StringConstraints, ValidationError, field_validator
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('conversation', __name__, url_prefix='/api/conversation')
 
+STREAMING_TOPICS = frozenset({'general', 'daily_life', 'academic', 'business', 'travel'})
+
+class StartStreamingRequest(BaseModel):
+    """Body of /streaming/start, parsed and validated from raw JSON in one pass"""
+    topic: str = 'general'
+    platform: str = 'heygen'
+
+    @field_validator('topic')
+    @classmethod
+    def _known_topic(cls, topic: str) -> str:
+        # Unknown topics fall back to a general conversation rather than failing
+        return topic if topic in STREAMING_TOPICS else 'general'
+
+class StreamingMessageRequest(BaseModel):
+    """Body of /streaming/message"""
+    sessionKey: Annotated[str, StringConstraints(min_length=1)]
+    message: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+    stream: bool = False
+
+# Error reported for the first invalid field of a streaming request
+STREAMING_FIELD_ERRORS = {
+    'sessionKey': 'Session key is required',
+    'message': 'Message cannot be empty'
+}
+
+def _validation_error(e: ValidationError):
+    METRICS.incr('conv.client_error')
+    errors = e.errors(include_url=False, include_context=False)
+    field = errors[0]['loc'][0] if errors and errors[0]['loc'] else None
+    return jsonify({
+        'success': False,
+        'error': STREAMING_FIELD_ERRORS.get(field, 'Invalid request body')
+    }), 400
+
+def _client_error(e: HTTPException):
+    """Reject a malformed request body (bad JSON, wrong content type); these are
+    expected under load and only counted, not logged with a traceback"""
+    METRICS.incr('conv.client_error')
+    return jsonify({
+        'success': False,
+        'error': e.description
+    }), e.code
+
+# Initialize services lazily to avoid application context issues; the service module
+# (and the OpenAI/HeyGen/Azure SDKs behind it) is only imported on first use
+@functools.cache
+def get_conversation_service():
+    from app.services.conversation_service import ConversationService
+    return ConversationService()
+
+@functools.cache
+def get_memory_context_cache():
+    from app.services.context_store import ConversationContextStore
+    return ConversationContextStore(
+        current_app.config.get('REDIS_URL'),
+        ttl=current_app.config.get('MEMORY_CONTEXT_CACHE_TTL', 120),
+        prefix='mem:ctx:'
+    )
+
+# Concurrent polls for the same user or session share one backend fetch
+_inflight_fetches = SingleFlight()
+
 @bp.route('/chat', methods=['POST'])
 @jwt_required()
 def chat_with_avatar():
     """Handle conversation messages with AI avatar"""
     try:
-        user_id = int(get_jwt_identity())
-        data = request.get_json()
+        user_id = current_user_id()
+        data = request.get_json() or {}
         
         # Validate input
         if not data or 'message' not in data:
@@ -32,8 +99,7 @@ def chat_with_avatar():
                 'error': 'Message cannot be empty'
             }), 400
 
-        # Initialize conversation service
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
 
         # Process the conversation (with pronunciation data if from audio)
         response_data = conversation_service.process_conversation(
@@ -52,8 +118,11 @@ def chat_with_avatar():
             'analytics': response_data.get('analytics')
         })
         
-    except Exception as e:
-        logging.error(f"Chat error: {str(e)}")
+    except HTTPException as e:
+        return _client_error(e)
+    except Exception:
+        logger.exception("Chat error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'An error occurred while processing your message'
@@ -64,8 +133,6 @@ def chat_with_avatar():
 def speech_to_text():
     """Convert speech audio to text"""
     try:
-        user_id = int(get_jwt_identity())
-        
         # Check if audio file is present
         if 'audio' not in request.files:
             return jsonify({
@@ -75,8 +142,7 @@ def speech_to_text():
             
         audio_file = request.files['audio']
         
-        # Initialize conversation service
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         
         # Process speech to text with pronunciation assessment
         text_result = conversation_service.speech_to_text(audio_file, assess_pronunciation=True)
@@ -89,8 +155,9 @@ def speech_to_text():
             'has_pronunciation_feedback': bool(text_result.get('pronunciation_data'))
         })
         
-    except Exception as e:
-        logging.error(f"Speech-to-text error: {str(e)}")
+    except Exception:
+        logger.exception("Speech-to-text error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to process audio'
@@ -101,13 +168,13 @@ def speech_to_text():
 def start_conversation_session():
     """Start a new conversation session"""
     try:
-        user_id = int(get_jwt_identity())
-        data = request.get_json()
+        user_id = current_user_id()
+        data = request.get_json() or {}
         
         platform = data.get('platform', 'text')
         topic = data.get('topic', 'general_conversation')
         
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         session_data = conversation_service.start_session(
             user_id=user_id,
             platform=platform,
@@ -120,8 +187,11 @@ def start_conversation_session():
             'welcomeMessage': session_data['welcome_message']
         })
         
-    except Exception as e:
-        logging.error(f"Start session error: {str(e)}")
+    except HTTPException as e:
+        return _client_error(e)
+    except Exception:
+        logger.exception("Start session error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to start conversation session'
@@ -132,8 +202,8 @@ def start_conversation_session():
 def end_conversation_session():
     """End conversation session and get analytics"""
     try:
-        user_id = int(get_jwt_identity())
-        data = request.get_json()
+        user_id = current_user_id()
+        data = request.get_json() or {}
         
         session_id = data.get('sessionId')
         if not session_id:
@@ -142,7 +212,7 @@ def end_conversation_session():
                 'error': 'Session ID is required'
             }), 400
             
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         analytics = conversation_service.end_session(user_id, session_id)
         
         return jsonify({
@@ -152,8 +222,11 @@ def end_conversation_session():
             'recommendations': analytics.get('recommendations')
         })
         
-    except Exception as e:
-        logging.error(f"End session error: {str(e)}")
+    except HTTPException as e:
+        return _client_error(e)
+    except Exception:
+        logger.exception("End session error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to end conversation session'
@@ -164,11 +237,11 @@ def end_conversation_session():
 def get_conversation_history():
     """Get user's conversation history"""
     try:
-        user_id = int(get_jwt_identity())
+        user_id = current_user_id()
         limit = request.args.get('limit', 10, type=int)
         offset = request.args.get('offset', 0, type=int)
         
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         history = conversation_service.get_user_history(
             user_id=user_id,
             limit=limit,
@@ -182,8 +255,9 @@ def get_conversation_history():
             'hasMore': history['has_more']
         })
         
-    except Exception as e:
-        logging.error(f"Get history error: {str(e)}")
+    except Exception:
+        logger.exception("Get history error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to retrieve conversation history'
@@ -198,22 +272,17 @@ def get_conversation_history():
 def start_streaming_conversation():
     """Start a streaming avatar conversation session"""
     try:
-        user_id = int(get_jwt_identity())
-        data = request.get_json()
-        
-        topic = data.get('topic', 'general')
-        platform = data.get('platform', 'heygen')
-        
-        # Validate topic
-        allowed_topics = ['general', 'daily_life', 'academic', 'business', 'travel']
-        if topic not in allowed_topics:
-            topic = 'general'
+        user_id = current_user_id()
+        try:
+            payload = StartStreamingRequest.model_validate_json(request.get_data() or b'{}')
+        except ValidationError as e:
+            return _validation_error(e)
         
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         session_result = conversation_service.start_streaming_conversation(
             user_id=user_id,
-            topic=topic,
-            platform=platform
+            topic=payload.topic,
+            platform=payload.platform
         )
         
         if "error" in session_result:
@@ -235,8 +304,9 @@ def start_streaming_conversation():
             'instructions': session_result['instructions']
         })
         
-    except Exception as e:
-        logging.error(f"Start streaming conversation error: {str(e)}")
+    except Exception:
+        logger.exception("Start streaming conversation error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to start streaming conversation'
@@ -245,27 +315,37 @@ def start_streaming_conversation():
 @bp.route('/streaming/message', methods=['POST'])
 @jwt_required()
 def process_streaming_message():
-    """Process a message in streaming avatar conversation"""
+    """
+    Process a message in streaming avatar conversation
+
+    With "stream": true in the body the AI response is sent as newline-delimited JSON
+    while it is generated: one {"token": ...} line per piece, then one final line with
+    the same fields as the non-streaming response.
+    """
     try:
-        user_id = int(get_jwt_identity())
-        data = request.get_json()
-        
-        session_key = data.get('sessionKey')
-        user_message = data.get('message', '').strip()
-        
-        if not session_key:
-            return jsonify({
-                'success': False,
-                'error': 'Session key is required'
-            }), 400
+        try:
+            payload = StreamingMessageRequest.model_validate_json(request.get_data())
+        except ValidationError as e:
+            return _validation_error(e)
+        
+        session_key = payload.sessionKey
+        user_message = payload.message
+        
+        conversation_service = get_conversation_service()
+        
+        if payload.stream:
+            def generate():
+                for item in conversation_service.stream_streaming_message(session_key, user_message):
+                    if 'token' in item:
+                        line = {'token': item['token']}
+                    elif 'error' in item:
+                        line = {'success': False, 'error': item['error']}
+                    else:
+                        line = _streaming_message_payload(item)
+                    yield current_app.json.dumps(line) + '\n'
             
-        if not user_message:
-            return jsonify({
-                'success': False,
-                'error': 'Message cannot be empty'
-            }), 400
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
-        conversation_service = ConversationService()
         result = conversation_service.process_streaming_message(
             session_key=session_key,
             user_message=user_message
@@ -277,30 +357,38 @@ def process_streaming_message():
                 'error': result['error']
             }), 400
         
-        return jsonify({
-            'success': True,
-            'userMessage': result['user_message'],
-            'aiResponse': result['ai_response'],
-            'taskId': result.get('task_id'),
-            'pronunciationScore': result.get('pronunciation_score'),
-            'conversationAnalysis': result.get('conversation_analysis'),
-            'timestamp': result.get('timestamp')
-        })
+        return jsonify(_streaming_message_payload(result))
         
-    except Exception as e:
-        logging.error(f"Process streaming message error: {str(e)}")
+    except Exception:
+        logger.exception("Process streaming message error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to process streaming message'
         }), 500
 
+# Service result key -> response key for streaming message turns
+STREAMING_MESSAGE_FIELDS = {
+    'user_message': 'userMessage',
+    'ai_response': 'aiResponse',
+    'task_id': 'taskId',
+    'pronunciation_score': 'pronunciationScore',
+    'conversation_analysis': 'conversationAnalysis',
+    'timestamp': 'timestamp'
+}
+
+def _streaming_message_payload(result):
+    """Response body for a processed streaming message (text or voice)"""
+    payload = {'success': True}
+    for key, name in STREAMING_MESSAGE_FIELDS.items():
+        payload[name] = result.get(key)
+    return payload
+
 @bp.route('/streaming/voice-message', methods=['POST'])
 @jwt_required()
 def process_streaming_voice_message():
     """Process a voice message in streaming avatar conversation"""
     try:
-        user_id = int(get_jwt_identity())
-        
         session_key = request.form.get('sessionKey')
         if not session_key:
             return jsonify({
@@ -315,14 +403,11 @@ def process_streaming_voice_message():
                 'error': 'No audio file provided'
             }), 400
             
-        audio_file = request.files['audio']
-        audio_data = audio_file.read()
-        
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         result = conversation_service.process_streaming_message(
             session_key=session_key,
             user_message="",  # Will be filled from audio transcription
-            audio_data=audio_data
+            audio_file=request.files['audio']
         )
         
         if "error" in result:
@@ -331,18 +416,11 @@ def process_streaming_voice_message():
                 'error': result['error']
             }), 400
         
-        return jsonify({
-            'success': True,
-            'userMessage': result['user_message'],
-            'aiResponse': result['ai_response'],
-            'taskId': result.get('task_id'),
-            'pronunciationScore': result.get('pronunciation_score'),
-            'conversationAnalysis': result.get('conversation_analysis'),
-            'timestamp': result.get('timestamp')
-        })
+        return jsonify(_streaming_message_payload(result))
         
-    except Exception as e:
-        logging.error(f"Process streaming voice message error: {str(e)}")
+    except Exception:
+        logger.exception("Process streaming voice message error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to process voice message'
@@ -353,8 +431,7 @@ def process_streaming_voice_message():
 def stop_streaming_conversation():
     """Stop streaming conversation and get detailed analytics"""
     try:
-        user_id = int(get_jwt_identity())
-        data = request.get_json()
+        data = request.get_json() or {}
         
         session_key = data.get('sessionKey')
         if not session_key:
@@ -363,7 +440,7 @@ def stop_streaming_conversation():
                 'error': 'Session key is required'
             }), 400
         
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         result = conversation_service.stop_streaming_conversation(session_key)
         
         if "error" in result:
@@ -379,8 +456,11 @@ def stop_streaming_conversation():
             'status': result['status']
         })
         
-    except Exception as e:
-        logging.error(f"Stop streaming conversation error: {str(e)}")
+    except HTTPException as e:
+        return _client_error(e)
+    except Exception:
+        logger.exception("Stop streaming conversation error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to stop streaming conversation'
@@ -391,10 +471,11 @@ def stop_streaming_conversation():
 def get_streaming_session_status(session_key):
     """Get current status of streaming session"""
     try:
-        user_id = int(get_jwt_identity())
-        
-        conversation_service = ConversationService()
-        status = conversation_service.get_streaming_session_status(session_key)
+        conversation_service = get_conversation_service()
+        status = _inflight_fetches.do(
+            f"stat:{session_key}",
+            lambda: conversation_service.get_streaming_session_status(session_key)
+        )
         
         if "error" in status:
             return jsonify({
@@ -402,13 +483,15 @@ def get_streaming_session_status(session_key):
                 'error': status['error']
             }), 404
         
-        return jsonify({
+        # Polled during a live call; clients revalidate with If-None-Match
+        return cacheable_response(jsonify({
             'success': True,
             'sessionInfo': status
-        })
+        }), max_age=2)
         
-    except Exception as e:
-        logging.error(f"Get streaming session status error: {str(e)}")
+    except Exception:
+        logger.exception("Get streaming session status error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to get session status'
@@ -419,9 +502,7 @@ def get_streaming_session_status(session_key):
 def get_streaming_token():
     """Get HeyGen streaming token for frontend"""
     try:
-        user_id = int(get_jwt_identity())
-        
-        conversation_service = ConversationService()
+        conversation_service = get_conversation_service()
         token_result = conversation_service.heygen_client.create_streaming_token()
         
         if "error" in token_result:
@@ -436,8 +517,9 @@ def get_streaming_token():
             'expiresAt': token_result.get('expires_at')
         })
         
-    except Exception as e:
-        logging.error(f"Get streaming token error: {str(e)}")
+    except Exception:
+        logger.exception("Get streaming token error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to get streaming token'
@@ -451,13 +533,14 @@ def reset_conversation():
     Useful when you want to start fresh or if old context is cached.
     """
     try:
-        user_id = int(get_jwt_identity())
+        user_id = current_user_id()
         context_key = f"user_{user_id}"
 
         # Clear old conversation context (use class-level storage)
-        if context_key in ConversationService._conversation_context:
-            del ConversationService._conversation_context[context_key]
-            logging.info(f"Cleared conversation context for user {user_id}")
+        conversation_context = get_conversation_service().conversation_context
+        if context_key in conversation_context:
+            del conversation_context[context_key]
+            logger.info("Cleared conversation context for user %s", user_id)
             message = 'Conversation reset successfully. Your next message will load latest memory!'
         else:
             message = 'No active conversation found. Your next message will create a fresh conversation with latest memory!'
@@ -467,13 +550,51 @@ def reset_conversation():
             'message': message
         })
 
-    except Exception as e:
-        logging.error(f"Reset conversation error: {str(e)}")
+    except Exception:
+        logger.exception("Reset conversation error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to reset conversation'
         }), 500
 
+def _load_memory_context(user_id: int) -> dict:
+    """Load a student's memory from all modules, formatted for avatar consumption"""
+    from app.services.memory_service import get_memory_service
+    memory_service = get_memory_service()
+
+    # Get memory from all modules
+    (reading_memory, listening_memory, speaking_memory,
+     writing_memory, conversation_memory) = memory_service.get_all_memories(user_id)
+
+    # Format for avatar consumption
+    return {
+        'reading': {
+            'vocabulary_struggles': reading_memory.get('vocabulary_gaps', []),
+            'comprehension_weaknesses': reading_memory.get('comprehension_weaknesses', []),
+            'summary': reading_memory.get('summary', '')
+        },
+        'listening': {
+            'comprehension_weaknesses': listening_memory.get('comprehension_weaknesses', []),
+            'summary': listening_memory.get('summary', '')
+        },
+        'speaking': {
+            'pronunciation_errors': speaking_memory.get('chronic_mispronunciations', []),
+            'problem_phonemes': speaking_memory.get('problem_phonemes', []),
+            'summary': speaking_memory.get('summary', '')
+        },
+        'writing': {
+            'grammar_errors': writing_memory.get('chronic_grammar_errors', []),
+            'style_issues': writing_memory.get('recurring_style_issues', []),
+            'summary': writing_memory.get('summary', '')
+        },
+        'conversation': {
+            'grammar_errors': conversation_memory.get('chronic_grammar_errors', []),
+            'vocabulary_gaps': conversation_memory.get('vocabulary_gaps', []),
+            'summary': conversation_memory.get('summary', '')
+        }
+    }
+
 @bp.route('/memory-context', methods=['GET'])
 @jwt_required()
 def get_memory_context():
@@ -482,53 +603,30 @@ def get_memory_context():
     This allows the avatar to reference vocabulary struggles, grammar patterns, etc.
     """
     try:
-        user_id = int(get_jwt_identity())
-
-        from app.services.memory_service import get_memory_service
-        memory_service = get_memory_service()
-
-        # Get memory from all modules
-        reading_memory = memory_service.get_reading_memory(user_id)
-        listening_memory = memory_service.get_listening_memory(user_id)
-        speaking_memory = memory_service.get_speaking_memory(user_id)
-        writing_memory = memory_service.get_writing_memory(user_id)
-        conversation_memory = memory_service.get_conversation_memory(user_id)
-
-        # Format for avatar consumption
-        memory_context = {
-            'reading': {
-                'vocabulary_struggles': reading_memory.get('vocabulary_gaps', []),
-                'comprehension_weaknesses': reading_memory.get('comprehension_weaknesses', []),
-                'summary': reading_memory.get('summary', '')
-            },
-            'listening': {
-                'comprehension_weaknesses': listening_memory.get('comprehension_weaknesses', []),
-                'summary': listening_memory.get('summary', '')
-            },
-            'speaking': {
-                'pronunciation_errors': speaking_memory.get('chronic_mispronunciations', []),
-                'problem_phonemes': speaking_memory.get('problem_phonemes', []),
-                'summary': speaking_memory.get('summary', '')
-            },
-            'writing': {
-                'grammar_errors': writing_memory.get('chronic_grammar_errors', []),
-                'style_issues': writing_memory.get('recurring_style_issues', []),
-                'summary': writing_memory.get('summary', '')
-            },
-            'conversation': {
-                'grammar_errors': conversation_memory.get('chronic_grammar_errors', []),
-                'vocabulary_gaps': conversation_memory.get('vocabulary_gaps', []),
-                'summary': conversation_memory.get('summary', '')
-            }
-        }
+        user_id = current_user_id()
 
-        return jsonify({
+        # Memory summaries change over minutes, so a short-lived cached copy is served as-is
+        cache = get_memory_context_cache()
+        cache_key = f"user_{user_id}"
+        memory_context = cache.get(cache_key)
+        if memory_context is not None:
+            return cacheable_response(jsonify({
+                'success': True,
+                'memoryContext': memory_context
+            }), max_age=60)
+
+        # Tabs polling at the same moment share a single database load
+        memory_context = _inflight_fetches.do(f"mem:{user_id}", lambda: _load_memory_context(user_id))
+        cache[cache_key] = memory_context
+
+        return cacheable_response(jsonify({
             'success': True,
             'memoryContext': memory_context
-        })
+        }), max_age=60)
 
-    except Exception as e:
-        logging.error(f"Get memory context error: {str(e)}")
+    except Exception:
+        logger.exception("Get memory context error")
+        METRICS.incr('conv.server_error')
         return jsonify({
             'success': False,
             'error': 'Failed to retrieve memory context'
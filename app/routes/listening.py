@@ -1,108 +1,153 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
+from app import db
+from app.models.session import LearningSession
+from app.services.context_store import ConversationContextStore
 from app.services.listening_service import ListeningService
+from app.services.memory_service import get_memory_service
 from app.api.azure_speech_client import AzureSpeechClient
 from app.api.openai_client import OpenAIClient
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import functools
+import hashlib
 import logging
-import json
+import os
+import shutil
+import tempfile
+import orjson
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('listening', __name__)
 
 # Initialize services lazily to avoid application context issues
+@functools.cache
 def get_listening_service():
-    if not hasattr(get_listening_service, '_service'):
-        get_listening_service._service = ListeningService()
-    return get_listening_service._service
+    return ListeningService()
 
+@functools.cache
 def get_azure_client():
-    if not hasattr(get_azure_client, '_client'):
-        get_azure_client._client = AzureSpeechClient()
-    return get_azure_client._client
+    return AzureSpeechClient()
 
+@functools.cache
 def get_openai_client():
-    if not hasattr(get_openai_client, '_client'):
-        get_openai_client._client = OpenAIClient()
-    return get_openai_client._client
+    return OpenAIClient()
+
+@functools.cache
+def get_listening_memory_cache():
+    return ConversationContextStore(
+        current_app.config.get('REDIS_URL'),
+        ttl=current_app.config.get('LISTENING_MEMORY_CACHE_TTL', 60),
+        prefix='mem:listening:'
+    )
+
+def _toefl_files(topic_id: int):
+    """
+    Resolve a TOEFL topic ID (101-153) to its title, category and file names
+
+    Returns:
+        Tuple of (title, category, audio_file, transcript_file)
+    """
+    actual_id = topic_id - 100  # Offset to avoid conflicts with the other topics
+    file_num = str(actual_id).zfill(4)
+
+    if actual_id % 2 == 1:  # Odd numbers are conversations
+        conv_num = (actual_id + 1) // 2
+        name = f"toefl-listening-{file_num}-toefl-conversation-{conv_num}"
+        return f"TOEFL Conversation {conv_num}", "toefl_conversation", f"{name}.mp3", f"{name}.txt"
+
+    # Even numbers are lectures
+    lec_num = actual_id // 2
+    name = f"toefl-listening-{file_num}-toefl-lecture-{lec_num}"
+    return f"TOEFL Lecture {lec_num}", "toefl_lecture", f"{name}.mp3", f"{name}.txt"
+
+def _build_toefl_topics():
+    """Build the TOEFL conversation and lecture lists from the available audio files"""
+    toefl_conversations = []
+    toefl_lectures = []
+
+    for i in range(1, 54):  # We have 53 TOEFL audio files
+        title, category, audio_file, transcript_file = _toefl_files(i + 100)
+        is_conversation = category == "toefl_conversation"
+        (toefl_conversations if is_conversation else toefl_lectures).append({
+            "id": i + 100,
+            "title": title,
+            "description": ("Campus conversation between students and staff" if is_conversation
+                            else "Academic lecture on various subjects"),
+            "audio_file": audio_file,
+            "transcript_file": transcript_file
+        })
+
+    return toefl_conversations, toefl_lectures
+
+# The topic catalogue is the same for every user, so it is built once at import
+_TOEFL_CONVERSATIONS, _TOEFL_LECTURES = _build_toefl_topics()
+
+# topic_id -> (title, category, audio_file, transcript_file) for the content routes
+_TOEFL_CONTENT_META = {topic_id: _toefl_files(topic_id) for topic_id in range(101, 154)}
+
+_TRANSCRIPT_DIR = os.path.join('data', 'transcripts')
+
+_TOPICS = {
+    "toefl_conversations": _TOEFL_CONVERSATIONS,
+    "toefl_lectures": _TOEFL_LECTURES,
+    "daily_life": [
+        {"id": 1, "title": "Morning Routine", "description": "Listen to someone describing their typical morning"},
+        {"id": 2, "title": "Shopping Experience", "description": "A conversation at a grocery store"},
+        {"id": 3, "title": "Weather Discussion", "description": "People talking about today's weather"}
+    ],
+    "academic": [
+        {"id": 4, "title": "University Lecture", "description": "Introduction to Biology lecture excerpt"},
+        {"id": 5, "title": "Study Groups", "description": "Students discussing their research project"},
+        {"id": 6, "title": "Campus Life", "description": "International students sharing experiences"}
+    ],
+    "business": [
+        {"id": 7, "title": "Job Interview", "description": "Professional interview conversation"},
+        {"id": 8, "title": "Business Meeting", "description": "Team discussing quarterly goals"},
+        {"id": 9, "title": "Workplace Communication", "description": "Colleagues collaborating on a project"}
+    ],
+    "travel": [
+        {"id": 10, "title": "Airport Announcements", "description": "Flight information and boarding calls"},
+        {"id": 11, "title": "Hotel Check-in", "description": "Guest checking into a hotel"},
+        {"id": 12, "title": "Tourist Information", "description": "Asking for directions and recommendations"}
+    ],
+    "news": [
+        {"id": 13, "title": "Technology News", "description": "Latest developments in AI and technology"},
+        {"id": 14, "title": "Health & Wellness", "description": "Tips for maintaining good health"},
+        {"id": 15, "title": "Environmental Issues", "description": "Climate change and conservation efforts"}
+    ],
+    "entertainment": [
+        {"id": 16, "title": "Movie Reviews", "description": "Critics discussing recent films"},
+        {"id": 17, "title": "Music Discussions", "description": "Musicians talking about their creative process"},
+        {"id": 18, "title": "Sports Commentary", "description": "Analysis of recent sports events"}
+    ]
+}
+
+# Serialized once too; repeat callers revalidate against the precomputed ETag
+_TOPICS_BODY = orjson.dumps({'success': True, 'topics': _TOPICS})
+_TOPICS_ETAG = hashlib.md5(_TOPICS_BODY).hexdigest()
 
 @bp.route('/topics', methods=['GET'])
 @jwt_required()
 def get_listening_topics():
     """Get available listening topics organized by category"""
-    try:
-        # Generate TOEFL topics dynamically from available audio files
-        toefl_conversations = []
-        toefl_lectures = []
-
-        for i in range(1, 54):  # We have 53 TOEFL audio files
-            file_num = str(i).zfill(4)
-            if i % 2 == 1:  # Odd numbers are conversations
-                conv_num = (i + 1) // 2
-                toefl_conversations.append({
-                    "id": i + 100,  # Offset to avoid conflicts
-                    "title": f"TOEFL Conversation {conv_num}",
-                    "description": "Campus conversation between students and staff",
-                    "audio_file": f"toefl-listening-{file_num}-toefl-conversation-{conv_num}.mp3",
-                    "transcript_file": f"toefl-listening-{file_num}-toefl-conversation-{conv_num}.txt"
-                })
-            else:  # Even numbers are lectures
-                lec_num = i // 2
-                toefl_lectures.append({
-                    "id": i + 100,
-                    "title": f"TOEFL Lecture {lec_num}",
-                    "description": "Academic lecture on various subjects",
-                    "audio_file": f"toefl-listening-{file_num}-toefl-lecture-{lec_num}.mp3",
-                    "transcript_file": f"toefl-listening-{file_num}-toefl-lecture-{lec_num}.txt"
-                })
-
-        topics = {
-            "toefl_conversations": toefl_conversations,
-            "toefl_lectures": toefl_lectures,
-            "daily_life": [
-                {"id": 1, "title": "Morning Routine", "description": "Listen to someone describing their typical morning"},
-                {"id": 2, "title": "Shopping Experience", "description": "A conversation at a grocery store"},
-                {"id": 3, "title": "Weather Discussion", "description": "People talking about today's weather"}
-            ],
-            "academic": [
-                {"id": 4, "title": "University Lecture", "description": "Introduction to Biology lecture excerpt"},
-                {"id": 5, "title": "Study Groups", "description": "Students discussing their research project"},
-                {"id": 6, "title": "Campus Life", "description": "International students sharing experiences"}
-            ],
-            "business": [
-                {"id": 7, "title": "Job Interview", "description": "Professional interview conversation"},
-                {"id": 8, "title": "Business Meeting", "description": "Team discussing quarterly goals"},
-                {"id": 9, "title": "Workplace Communication", "description": "Colleagues collaborating on a project"}
-            ],
-            "travel": [
-                {"id": 10, "title": "Airport Announcements", "description": "Flight information and boarding calls"},
-                {"id": 11, "title": "Hotel Check-in", "description": "Guest checking into a hotel"},
-                {"id": 12, "title": "Tourist Information", "description": "Asking for directions and recommendations"}
-            ],
-            "news": [
-                {"id": 13, "title": "Technology News", "description": "Latest developments in AI and technology"},
-                {"id": 14, "title": "Health & Wellness", "description": "Tips for maintaining good health"},
-                {"id": 15, "title": "Environmental Issues", "description": "Climate change and conservation efforts"}
-            ],
-            "entertainment": [
-                {"id": 16, "title": "Movie Reviews", "description": "Critics discussing recent films"},
-                {"id": 17, "title": "Music Discussions", "description": "Musicians talking about their creative process"},
-                {"id": 18, "title": "Sports Commentary", "description": "Analysis of recent sports events"}
-            ]
-        }
-
-        return jsonify({
-            'success': True,
-            'topics': topics
-        })
-
-    except Exception as e:
-        logger.error(f"Error getting listening topics: {e}")
-        return jsonify({
-            'success': False,
-            'error': 'Failed to load listening topics'
-        }), 500
+    response = current_app.response_class(_TOPICS_BODY, mimetype='application/json')
+    response.set_etag(_TOPICS_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
+@functools.lru_cache(maxsize=256)
+def _read_transcript(path: str) -> str:
+    """Read a transcript file once per process; call _read_transcript.cache_clear() after editing transcripts
+
+    A missing file raises FileNotFoundError, which lru_cache does not cache, so a
+    transcript deployed later is picked up on the next request.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
 
 @bp.route('/content/<int:topic_id>', methods=['GET'])
 @jwt_required()
@@ -110,38 +155,23 @@ def get_listening_content(topic_id):
     """Get audio content and transcript for a specific topic"""
     try:
         student_id = int(get_jwt_identity())
-        import os
 
         # Handle TOEFL content (IDs 101-153)
         if topic_id > 100:
-            actual_id = topic_id - 100
-            file_num = str(actual_id).zfill(4)
-
-            if actual_id % 2 == 1:  # Conversation
-                conv_num = (actual_id + 1) // 2
-                audio_file = f"toefl-listening-{file_num}-toefl-conversation-{conv_num}.mp3"
-                transcript_file = f"toefl-listening-{file_num}-toefl-conversation-{conv_num}.txt"
-                title = f"TOEFL Conversation {conv_num}"
-                category = "toefl_conversation"
-            else:  # Lecture
-                lec_num = actual_id // 2
-                audio_file = f"toefl-listening-{file_num}-toefl-lecture-{lec_num}.mp3"
-                transcript_file = f"toefl-listening-{file_num}-toefl-lecture-{lec_num}.txt"
-                title = f"TOEFL Lecture {lec_num}"
-                category = "toefl_lecture"
+            meta = _TOEFL_CONTENT_META.get(topic_id) or _toefl_files(topic_id)
+            title, category, audio_file, transcript_file = meta
 
             # Read transcript
-            transcript_path = os.path.join('data', 'transcripts', transcript_file)
+            transcript_path = os.path.join(_TRANSCRIPT_DIR, transcript_file)
             try:
-                with open(transcript_path, 'r', encoding='utf-8') as f:
-                    transcript = f.read().strip()
+                transcript = _read_transcript(transcript_path)
             except FileNotFoundError:
                 logger.warning(f"Transcript not found: {transcript_path}")
                 transcript = "Transcript not available"
 
             content = {
                 "title": title,
-                "audio_url": f"/static/audio/{audio_file}",
+                "audio_url": f"/audio/{audio_file}",
                 "transcript": transcript,
                 "duration": 180,  # Approximate duration in seconds
                 "difficulty": "advanced",
@@ -157,7 +187,7 @@ def get_listening_content(topic_id):
         content_data = {
             1: {
                 "title": "Morning Routine",
-                "audio_url": "/static/audio/morning_routine.mp3",
+                "audio_url": "/audio/morning_routine.mp3",
                 "transcript": "Good morning! I usually wake up at 6:30 AM. The first thing I do is check my phone for any important messages, then I head to the bathroom to brush my teeth and wash my face. After that, I go to the kitchen to make coffee and prepare a simple breakfast, usually toast with jam or cereal with milk. While eating, I like to read the news on my tablet to stay updated with current events. Before leaving for work, I make sure to grab my keys, wallet, and lunch that I prepared the night before.",
                 "duration": 45,
                 "difficulty": "beginner",
@@ -177,7 +207,7 @@ def get_listening_content(topic_id):
 
             content_data[topic_id] = {
                 "title": f"Topic {topic_id}",
-                "audio_url": f"/static/audio/topic_{topic_id}.mp3",
+                "audio_url": f"/audio/topic_{topic_id}.mp3",
                 "transcript": transcript,
                 "duration": 60,
                 "difficulty": "intermediate",
@@ -198,6 +228,25 @@ def get_listening_content(topic_id):
             'error': 'Failed to load listening content'
         }), 500
 
+@bp.route('/transcript/<int:topic_id>', methods=['GET'])
+@jwt_required()
+def get_listening_transcript(topic_id):
+    """
+    Send a TOEFL transcript as plain text straight from disk
+
+    send_file hands the open file to the WSGI server's file wrapper (sendfile()
+    under gunicorn) and answers If-None-Match / If-Modified-Since with 304.
+    """
+    meta = _TOEFL_CONTENT_META.get(topic_id)
+    transcript_path = meta and os.path.abspath(os.path.join(_TRANSCRIPT_DIR, meta[3]))
+    if not transcript_path or not os.path.isfile(transcript_path):
+        return jsonify({
+            'success': False,
+            'error': 'Transcript not found'
+        }), 404
+
+    return send_file(transcript_path, mimetype='text/plain', conditional=True)
+
 @bp.route('/transcribe', methods=['POST'])
 @jwt_required()
 def transcribe_audio():
@@ -219,12 +268,10 @@ def transcribe_audio():
                 'error': 'No file selected'
             }), 400
 
-        # Save audio file temporarily
-        import tempfile
-        import os
-
+        # Save audio file temporarily; the Azure SDK only reads from a path.
+        # Copy through the handle already open instead of reopening it by name
         with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            audio_file.save(temp_file.name)
+            shutil.copyfileobj(audio_file.stream, temp_file, 1 << 20)
             temp_path = temp_file.name
 
         try:
@@ -247,8 +294,12 @@ def transcribe_audio():
 
         finally:
             # Clean up temporary file
-            if os.path.exists(temp_path):
+            try:
                 os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove temporary audio file {temp_path}: {e}")
 
     except Exception as e:
         logger.error(f"Error in audio transcription: {e}")
@@ -257,46 +308,64 @@ def transcribe_audio():
             'error': 'Failed to transcribe audio'
         }), 500
 
-@bp.route('/questions', methods=['POST'])
-@jwt_required()
-def generate_questions():
-    """Generate comprehension questions based on listening content"""
-    try:
-        student_id = int(get_jwt_identity())
-        data = request.get_json()
-
-        if not data or 'transcript' not in data:
-            return jsonify({
-                'success': False,
-                'error': 'Transcript is required'
-            }), 400
-
-        transcript = data['transcript']
-        topic_id = data.get('topic_id')
-        mode = data.get('mode', 'practice')  # 'practice' or 'test'
-
-        # === LOAD MEMORY FOR ADAPTIVE QUESTIONS ===
-        from app.services.memory_service import get_memory_service
-        memory_service = get_memory_service()
-        listening_memory = memory_service.get_listening_memory(student_id)
-
-        # Build adaptive instructions based on memory
-        adaptive_instructions = ""
-        if listening_memory.get('comprehension_weaknesses'):
-            weak_skills = [w.get('skill', '') for w in listening_memory['comprehension_weaknesses'][:3]]
-            if weak_skills:
-                adaptive_instructions += f"\n- PRIORITIZE these question types the student struggles with: {', '.join(weak_skills)}"
-
-        if listening_memory.get('summary'):
-            adaptive_instructions += f"\n- Student history: {listening_memory['summary'][:150]}"
-
-        # === END MEMORY LOAD ===
-
-        try:
-            # Generate questions using OpenAI
-            openai_client = get_openai_client()
-
-            prompt = f"""
+# Served when OpenAI replies with something other than question JSON
+_FALLBACK_QUESTIONS_PARSE_FAIL = [
+    {
+        "id": 1,
+        "question": "What was the main topic of the listening passage?",
+        "options": {
+            "A": "Daily routine activities",
+            "B": "Travel experiences",
+            "C": "Business meetings",
+            "D": "Academic discussions"
+        },
+        "correct_answer": "A",
+        "explanation": "The passage focused on describing daily routine activities."
+    },
+    {
+        "id": 2,
+        "question": "According to the speaker, what time do they usually wake up?",
+        "options": {
+            "A": "6:00 AM",
+            "B": "6:30 AM",
+            "C": "7:00 AM",
+            "D": "7:30 AM"
+        },
+        "correct_answer": "B",
+        "explanation": "The speaker mentioned waking up at 6:30 AM."
+    }
+]
+
+# Served when question generation fails altogether
+_FALLBACK_QUESTIONS_OPENAI_FAIL = [
+    {
+        "id": 1,
+        "question": "What was the main topic discussed in the audio?",
+        "options": {
+            "A": "Technology and innovation",
+            "B": "Daily life activities",
+            "C": "Travel experiences",
+            "D": "Business strategies"
+        },
+        "correct_answer": "B",
+        "explanation": "The audio primarily discussed daily life activities and routines."
+    },
+    {
+        "id": 2,
+        "question": "Which of the following was mentioned in the listening?",
+        "options": {
+            "A": "Morning exercise routine",
+            "B": "Cooking dinner",
+            "C": "Checking messages",
+            "D": "Evening entertainment"
+        },
+        "correct_answer": "C",
+        "explanation": "The speaker mentioned checking messages as part of their routine."
+    }
+]
+
+# Question generation prompt, filled with str.format_map per request
+_QUESTION_PROMPT_TEMPLATE = """
             Based on the following listening transcript, generate 5 comprehension questions suitable for English language learners.
 
             Transcript: {transcript}
@@ -335,6 +404,55 @@ def generate_questions():
             }}
             """
 
+@bp.route('/questions', methods=['POST'])
+@jwt_required()
+def generate_questions():
+    """Generate comprehension questions based on listening content"""
+    try:
+        student_id = int(get_jwt_identity())
+        data = request.get_json()
+
+        if not data or 'transcript' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Transcript is required'
+            }), 400
+
+        transcript = data['transcript']
+        topic_id = data.get('topic_id')
+        mode = data.get('mode', 'practice')  # 'practice' or 'test'
+
+        # === LOAD MEMORY FOR ADAPTIVE QUESTIONS ===
+        # Cached briefly: a student usually generates several question sets in a row
+        memory_cache = get_listening_memory_cache()
+        cache_key = f"student_{student_id}"
+        listening_memory = memory_cache.get(cache_key)
+        if listening_memory is None:
+            listening_memory = get_memory_service().get_listening_memory(student_id)
+            memory_cache[cache_key] = listening_memory
+
+        # Build adaptive instructions based on memory
+        adaptive_parts = []
+        if listening_memory.get('comprehension_weaknesses'):
+            weak_skills = [w.get('skill', '') for w in listening_memory['comprehension_weaknesses'][:3]]
+            if weak_skills:
+                adaptive_parts.append(f"\n- PRIORITIZE these question types the student struggles with: {', '.join(weak_skills)}")
+
+        if listening_memory.get('summary'):
+            adaptive_parts.append(f"\n- Student history: {listening_memory['summary'][:150]}")
+        adaptive_instructions = ''.join(adaptive_parts)
+
+        # === END MEMORY LOAD ===
+
+        try:
+            # Generate questions using OpenAI
+            openai_client = get_openai_client()
+
+            prompt = _QUESTION_PROMPT_TEMPLATE.format_map({
+                'transcript': transcript,
+                'adaptive_instructions': adaptive_instructions
+            })
+
             response = openai_client.generate_content(prompt)
 
             # Parse the JSON response
@@ -343,42 +461,16 @@ def generate_questions():
                 if isinstance(response, dict) and "error" in response:
                     raise ValueError(f"OpenAI unavailable: {response['error']}")
 
+                # generate_content already parsed the reply; raw "content" means it was not JSON
                 if isinstance(response, dict) and "content" in response:
-                    questions_data = json.loads(response["content"])
+                    raise ValueError("OpenAI returned non-JSON content")
                 elif isinstance(response, dict):
                     questions_data = response
                 else:
-                    questions_data = json.loads(response)
-            except (json.JSONDecodeError, ValueError):
+                    questions_data = orjson.loads(response)
+            except ValueError:
                 # Fallback questions if JSON parsing fails
-                questions_data = {
-                    "questions": [
-                        {
-                            "id": 1,
-                            "question": "What was the main topic of the listening passage?",
-                            "options": {
-                                "A": "Daily routine activities",
-                                "B": "Travel experiences",
-                                "C": "Business meetings",
-                                "D": "Academic discussions"
-                            },
-                            "correct_answer": "A",
-                            "explanation": "The passage focused on describing daily routine activities."
-                        },
-                        {
-                            "id": 2,
-                            "question": "According to the speaker, what time do they usually wake up?",
-                            "options": {
-                                "A": "6:00 AM",
-                                "B": "6:30 AM",
-                                "C": "7:00 AM",
-                                "D": "7:30 AM"
-                            },
-                            "correct_answer": "B",
-                            "explanation": "The speaker mentioned waking up at 6:30 AM."
-                        }
-                    ]
-                }
+                questions_data = {"questions": _FALLBACK_QUESTIONS_PARSE_FAIL}
 
             return jsonify({
                 'success': True,
@@ -388,37 +480,9 @@ def generate_questions():
 
         except Exception as e:
             logger.error(f"OpenAI question generation failed: {e}")
-            # Fallback questions
-            fallback_questions = [
-                {
-                    "id": 1,
-                    "question": "What was the main topic discussed in the audio?",
-                    "options": {
-                        "A": "Technology and innovation",
-                        "B": "Daily life activities",
-                        "C": "Travel experiences",
-                        "D": "Business strategies"
-                    },
-                    "correct_answer": "B",
-                    "explanation": "The audio primarily discussed daily life activities and routines."
-                },
-                {
-                    "id": 2,
-                    "question": "Which of the following was mentioned in the listening?",
-                    "options": {
-                        "A": "Morning exercise routine",
-                        "B": "Cooking dinner",
-                        "C": "Checking messages",
-                        "D": "Evening entertainment"
-                    },
-                    "correct_answer": "C",
-                    "explanation": "The speaker mentioned checking messages as part of their routine."
-                }
-            ]
-
             return jsonify({
                 'success': True,
-                'questions': fallback_questions,
+                'questions': _FALLBACK_QUESTIONS_OPENAI_FAIL,
                 'mode': mode
             })
 
@@ -429,6 +493,65 @@ def generate_questions():
             'error': 'Failed to generate questions'
         }), 500
 
+# (minimum score, performance level, recommendations), checked from the top
+_FEEDBACK_BANDS = (
+    (80, 'Excellent', [
+        "Great job! Keep up the excellent work!",
+        "Your comprehension is strong",
+        "You're ready for advanced materials"
+    ]),
+    (70, 'Good', [
+        "Great job! Keep up the excellent work!",
+        "Your comprehension is strong",
+        "Review transcript for missed questions"
+    ]),
+    (60, 'Good', [
+        "Practice listening to more TOEFL audio materials",
+        "Your comprehension is strong",
+        "Review transcript for missed questions"
+    ]),
+    (0, 'Needs Improvement', [
+        "Practice listening to more TOEFL audio materials",
+        "Focus on identifying key details",
+        "Review transcript for missed questions"
+    ])
+)
+
+# Runs memory board updates off the request thread
+_MEMORY_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='listening-memory')
+
+def _update_listening_memory(app, student_id: int, session_id: int):
+    """Extract insights from a completed listening session and compress memory when due"""
+    with app.app_context():
+        memory_service = get_memory_service()
+
+        try:
+            # Extract insights
+            memory_service.extract_listening_session_insights(
+                student_id=student_id,
+                session_id=session_id
+            )
+            logger.info(f"Extracted listening memory insights for session {session_id}")
+
+            # Check if we should compress memory
+            if memory_service.should_compress_listening_memory(student_id):
+                logger.info(f"Compressing listening memory for student {student_id}")
+                compressed = memory_service.compress_listening_memory(
+                    student_id=student_id,
+                    use_ai=True
+                )
+                logger.info(f"Listening memory compression complete. Summary: {compressed.get('summary', 'N/A')[:100]}")
+
+        except Exception as mem_error:
+            # Memory tracking is best-effort; the session itself is already saved
+            logger.error(f"Listening memory tracking error (non-fatal): {mem_error}")
+
+        # Next question generation picks up the updated memory
+        try:
+            del get_listening_memory_cache()[f"student_{student_id}"]
+        except KeyError:
+            pass
+
 @bp.route('/submit', methods=['POST'])
 @jwt_required()
 def submit_answers():
@@ -448,34 +571,37 @@ def submit_answers():
         questions = data.get('questions', [])  # Questions with correct answers
         mode = data.get('mode', 'practice')
 
-        # Create or update listening session
-        session = get_listening_service().create_listening_session(student_id, f"Topic {topic_id}")
+        # Create the listening session; it is inserted together with its results below
+        session = get_listening_service().create_listening_session(student_id, f"Topic {topic_id}", commit=False)
 
         # Calculate score based on submitted answers
         correct_answers = 0
         total_questions = len(questions)
+        num_answers = len(answers)
         detailed_results = []
 
         for i, question in enumerate(questions):
-            student_answer = answers[i] if i < len(answers) else None
-            is_correct = student_answer == question.get('correct_answer')
-
-            if is_correct:
-                correct_answers += 1
+            correct_answer = question.get('correct_answer')
+            student_answer = answers[i] if i < num_answers else None
+            is_correct = student_answer == correct_answer
+            correct_answers += is_correct
 
             detailed_results.append({
                 'question': question.get('question'),
                 'student_answer': student_answer,
-                'correct_answer': question.get('correct_answer'),
+                'correct_answer': correct_answer,
                 'is_correct': is_correct
             })
 
         score = (correct_answers / total_questions * 100) if total_questions > 0 else 0
 
-        # Update session with results
+        # Update session with results. Timestamps are stored as naive UTC; the row is only
+        # inserted now, so started_at is set here rather than left to the column default
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
         session.performance_score = score
         session.is_completed = True
-        session.completed_at = datetime.utcnow()
+        session.started_at = now
+        session.completed_at = now
         session.session_data = {
             'topic_id': topic_id,
             'mode': mode,
@@ -486,48 +612,22 @@ def submit_answers():
             'detailed_results': detailed_results
         }
 
-        from app import db
         db.session.commit()
 
         # === MEMORY BOARD INTEGRATION ===
-        # Extract insights from this session (mistakes, patterns, challenges)
-        from app.services.memory_service import get_memory_service
-        memory_service = get_memory_service()
-
-        try:
-            # Extract insights
-            insight = memory_service.extract_listening_session_insights(
-                student_id=student_id,
-                session_id=session.id
-            )
-            logger.info(f"Extracted listening memory insights for session {session.id}")
-
-            # Check if we should compress memory
-            if memory_service.should_compress_listening_memory(student_id):
-                logger.info(f"Compressing listening memory for student {student_id}")
-                compressed = memory_service.compress_listening_memory(
-                    student_id=student_id,
-                    use_ai=True
-                )
-                logger.info(f"Listening memory compression complete. Summary: {compressed.get('summary', 'N/A')[:100]}")
-
-        except Exception as mem_error:
-            logger.error(f"Listening memory tracking error (non-fatal): {mem_error}")
-            # Don't fail the whole session if memory tracking fails
-
+        # Extract insights from this session (mistakes, patterns, challenges) after responding;
+        # compression can make an OpenAI call that the student should not wait for
+        _MEMORY_EXECUTOR.submit(_update_listening_memory, current_app._get_current_object(), student_id, session.id)
         # === END MEMORY BOARD INTEGRATION ===
 
         # Generate feedback
+        _, performance_level, recommendations = next(band for band in _FEEDBACK_BANDS if score >= band[0])
         feedback = {
             'score': score,
             'correct_answers': correct_answers,
             'total_questions': total_questions,
-            'performance_level': 'Excellent' if score >= 80 else 'Good' if score >= 60 else 'Needs Improvement',
-            'recommendations': [
-                "Practice listening to more TOEFL audio materials" if score < 70 else "Great job! Keep up the excellent work!",
-                "Focus on identifying key details" if score < 60 else "Your comprehension is strong",
-                "Review transcript for missed questions" if score < 80 else "You're ready for advanced materials"
-            ],
+            'performance_level': performance_level,
+            'recommendations': recommendations,
             'detailed_results': detailed_results
         }
 
@@ -551,11 +651,19 @@ def get_listening_sessions():
     try:
         student_id = int(get_jwt_identity())
 
-        from app.models.session import LearningSession
-        sessions = LearningSession.query.filter_by(
-            student_id=student_id,
-            module_type='listening'
-        ).order_by(LearningSession.started_at.desc()).limit(10).all()
+        # Summary columns only; the session_data JSON is served by /sessions/<id>
+        sessions = db.session.execute(
+            select(
+                LearningSession.id,
+                LearningSession.started_at,
+                LearningSession.completed_at,
+                LearningSession.performance_score,
+                LearningSession.is_completed
+            )
+            .filter_by(student_id=student_id, module_type='listening')
+            .order_by(LearningSession.started_at.desc())
+            .limit(10)
+        ).all()
 
         session_data = []
         for session in sessions:
@@ -564,8 +672,7 @@ def get_listening_sessions():
                 'started_at': session.started_at.isoformat() if session.started_at else None,
                 'completed_at': session.completed_at.isoformat() if session.completed_at else None,
                 'performance_score': session.performance_score,
-                'is_completed': session.is_completed,
-                'session_data': session.session_data
+                'is_completed': session.is_completed
             })
 
         return jsonify({
@@ -578,4 +685,39 @@ def get_listening_sessions():
         return jsonify({
             'success': False,
             'error': 'Failed to get session history'
-        }), 500
\ No newline at end of file
+        }), 500
+
+@bp.route('/sessions/<int:session_id>', methods=['GET'])
+@jwt_required()
+def get_listening_session(session_id):
+    """Get one listening session of the current user, including its answers and results"""
+    try:
+        student_id = int(get_jwt_identity())
+
+        session = db.session.execute(
+            select(LearningSession).filter_by(id=session_id, student_id=student_id, module_type='listening')
+        ).scalar_one_or_none()
+        if session is None:
+            return jsonify({
+                'success': False,
+                'error': 'Session not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'session': {
+                'id': session.id,
+                'started_at': session.started_at.isoformat() if session.started_at else None,
+                'completed_at': session.completed_at.isoformat() if session.completed_at else None,
+                'performance_score': session.performance_score,
+                'is_completed': session.is_completed,
+                'session_data': session.session_data
+            }
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting listening session {session_id}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get session'
+        }), 500
@@ -1,62 +1,84 @@
-from flask import Blueprint, render_template, request, jsonify, send_file
+from flask import Blueprint, render_template, request, jsonify, send_from_directory, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+import orjson
 import os
 
 bp = Blueprint('main', __name__)
 
+# The page templates take no context, so each is rendered once per process
+# (unless templates auto-reload, as in debug mode)
+_RENDERED_PAGES = {}
+
+def _static_page(template: str):
+    page = _RENDERED_PAGES.get(template)
+    if page is None:
+        page = render_template(template).encode()
+        if not current_app.jinja_env.auto_reload:
+            _RENDERED_PAGES[template] = page
+    return current_app.response_class(page, mimetype='text/html')
+
+# Project root is fixed for the life of the process
+_SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'samples')
+
 @bp.route('/')
 def index():
     """Main landing page"""
-    return render_template('index.html')
+    return _static_page('index.html')
 
 @bp.route('/login')
 def login_page():
     """Login page"""
-    return render_template('login.html')
+    return _static_page('login.html')
 
 @bp.route('/reading')
 def reading_interface():
     """Interactive reading interface"""
-    return render_template('reading.html')
+    return _static_page('reading.html')
 
 @bp.route('/conversation')
 def conversation_interface():
     """Avatar conversation interface"""
-    return render_template('conversation.html')
+    return _static_page('conversation.html')
 
 @bp.route('/speaking')
 def speaking_interface():
     """Speaking practice interface"""
-    return render_template('speaking.html')
+    return _static_page('speaking.html')
 
 @bp.route('/listening')
 def listening_interface():
     """Listening practice interface"""
-    return render_template('listening.html')
+    return _static_page('listening.html')
 
 @bp.route('/writing')
 def writing_interface():
     """Writing practice interface"""
-    return render_template('writing.html')
+    return _static_page('writing.html')
 
 @bp.route('/dashboard')
 def dashboard():
     """User dashboard - redirect to homepage for now"""
-    return render_template('index.html')
+    return _static_page('index.html')
 
 @bp.route('/logout')
 def logout():
     """Logout page - redirect to homepage for now"""
-    return render_template('index.html')
+    return _static_page('index.html')
+
+# Polled by load balancers every few seconds; the body never changes
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'language-arts-agent',
+    'version': '0.1.0'
+})
 
 @bp.route('/health')
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'language-arts-agent',
-        'version': '0.1.0'
-    })
+    # A fresh Response each time: after_request handlers (CORS, compression) modify it
+    return current_app.response_class(_HEALTH_BODY, mimetype='application/json')
 
 @bp.route('/api/status')
 @jwt_required()
@@ -69,22 +91,36 @@ def api_status():
         'available_modules': ['reading', 'speaking', 'listening', 'writing', 'conversation']
     })
 
+@bp.route('/audio/<path:filename>')
+def serve_audio_file(filename):
+    """
+    Serve listening audio
+
+    Behind nginx, set AUDIO_ACCEL_REDIRECT to an internal location aliased to
+    static/audio so nginx sends the file itself. Otherwise send_from_directory
+    streams it with Range and conditional request support.
+    """
+    audio_dir = os.path.join(current_app.static_folder, 'audio')
+
+    accel_prefix = current_app.config.get('AUDIO_ACCEL_REDIRECT')
+    if accel_prefix:
+        # Same path check send_from_directory applies, since nginx resolves the file instead
+        if safe_join(audio_dir, filename) is None:
+            return jsonify({'error': 'Invalid file path'}), 400
+        response = current_app.response_class(mimetype='audio/mpeg')
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + filename
+        return response
+
+    return send_from_directory(audio_dir, filename, conditional=True,
+                               max_age=current_app.config.get('AUDIO_CACHE_MAX_AGE'))
+
 @bp.route('/samples/<filename>')
 def serve_sample_files(filename):
     """Serve sample content files"""
     try:
-        # Get the project root directory
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        samples_dir = os.path.join(project_root, 'samples')
-        file_path = os.path.join(samples_dir, filename)
-
-        # Security check - ensure file is within samples directory
-        if not file_path.startswith(samples_dir):
-            return jsonify({'error': 'Invalid file path'}), 400
-
-        if os.path.exists(file_path):
-            return send_file(file_path, mimetype='application/json')
-        else:
-            return jsonify({'error': 'File not found'}), 404
+        # send_from_directory rejects paths outside the samples directory
+        return send_from_directory(_SAMPLES_DIR, filename, mimetype='application/json', conditional=True)
+    except NotFound:
+        return jsonify({'error': 'File not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -4,14 +4,82 @@ Memory Board Routes
 API endpoints for accessing student memory board across all modules.
 """
 
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import event
+from app.models.memory import StudentMemoryBoard
+from app.services.context_store import ConversationContextStore
 from app.services.memory_service import get_memory_service
+from app.utils import current_user_id, json_response
+import functools
 import logging
+import orjson
 
 bp = Blueprint('memory', __name__, url_prefix='/api/memory')
 logger = logging.getLogger(__name__)
 
+# MemoryService holds no app state, so the shared instance is bound once at import
+_MEMORY_SERVICE = get_memory_service()
+
+
+@functools.cache
+def get_memory_board_cache():
+    """Short-lived cache of /board payloads keyed by "student_<id>"; the frontend polls it"""
+    return ConversationContextStore(
+        current_app.config.get('REDIS_URL'),
+        ttl=current_app.config.get('MEMORY_BOARD_CACHE_TTL', 5),
+        prefix='mem:board:'
+    )
+
+
+@event.listens_for(StudentMemoryBoard, 'after_update')
+def _evict_cached_board(mapper, connection, memory_board):
+    """Drop a student's cached board as soon as any module writes to it"""
+    # Nothing is cached yet if no /board request has built the store
+    if get_memory_board_cache.cache_info().currsize:
+        try:
+            del get_memory_board_cache()[f"student_{memory_board.student_id}"]
+        except KeyError:
+            pass
+
+
+# Boards whose JSON exceeds this are streamed as per-field chunks instead of one body
+BOARD_STREAM_THRESHOLD = 64 * 1024
+
+BOARD_MEMORY_FIELDS = (
+    'reading_memory', 'listening_memory', 'speaking_memory',
+    'writing_memory', 'conversation_memory', 'overall_patterns'
+)
+
+# Students who have not used any module yet all get this body, apart from last_updated
+_EMPTY_BOARD_PREFIX = orjson.dumps({
+    'success': True,
+    'memory_board': dict.fromkeys(BOARD_MEMORY_FIELDS, {})
+})[:-2] + b',"last_updated":'
+
+
+def _board_response(board_data):
+    """
+    Build the /board success response from the board's fields.
+
+    Each field is encoded separately; small boards are joined into a single body
+    (identical to json_response output), large ones are sent as a chunked stream
+    so the fragments are never copied into one large bytes object.
+    """
+    if not any(board_data[field] for field in BOARD_MEMORY_FIELDS):
+        body = _EMPTY_BOARD_PREFIX + orjson.dumps(board_data['last_updated']) + b'}}'
+        return current_app.response_class(body, mimetype='application/json')
+
+    chunks = [b'{"success":true,"memory_board":{']
+    for i, (key, value) in enumerate(board_data.items()):
+        chunks.append((b',"' if i else b'"') + key.encode() + b'":' + orjson.dumps(value))
+    chunks.append(b'}}')
+
+    if sum(map(len, chunks)) > BOARD_STREAM_THRESHOLD:
+        return current_app.response_class(iter(chunks), mimetype='application/json')
+    return current_app.response_class(b''.join(chunks), mimetype='application/json')
+
 
 @bp.route('/board', methods=['GET'])
 @jwt_required()
@@ -29,149 +97,77 @@ def get_memory_board():
         - overall_patterns
     """
     try:
-        student_id = int(get_jwt_identity())
-        memory_service = get_memory_service()
-
-        # Get memory board
-        memory_board = memory_service.get_or_create_memory_board(student_id)
-
-        # Build response
-        response_data = {
-            'success': True,
-            'memory_board': {
+        student_id = current_user_id()
+
+        cache = get_memory_board_cache()
+        cache_key = f"student_{student_id}"
+        board_data = cache.get(cache_key)
+        if board_data is None:
+            # Get memory board; 'or {}' covers rows not yet backfilled
+            memory_board = _MEMORY_SERVICE.get_memory_board_for_display(student_id)
+            board_data = {
                 'reading_memory': memory_board.reading_memory or {},
                 'listening_memory': memory_board.listening_memory or {},
                 'speaking_memory': memory_board.speaking_memory or {},
                 'writing_memory': memory_board.writing_memory or {},
                 'conversation_memory': memory_board.conversation_memory or {},
                 'overall_patterns': memory_board.overall_patterns or {},
-                'last_updated': memory_board.updated_at.isoformat() if memory_board.updated_at else None
+                'last_updated': memory_board.updated_at  # encoded as ISO 8601 by orjson
             }
-        }
-
-        logger.info(f"Memory board retrieved for student {student_id}")
-        return jsonify(response_data), 200
+            cache[cache_key] = board_data
 
-    except Exception as e:
-        logger.error(f"Error retrieving memory board: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return jsonify({
-            'success': False,
-            'error': 'Failed to retrieve memory board'
-        }), 500
+        # Every write to the board bumps updated_at, so it identifies the payload
+        last_updated = board_data['last_updated']
+        etag = last_updated.isoformat() if isinstance(last_updated, datetime) else last_updated
 
+        if etag and request.if_none_match.contains_weak(etag):
+            # Unchanged since the client's copy: skip serializing the board
+            response = current_app.response_class(status=304)
+        else:
+            response = _board_response(board_data)
 
-@bp.route('/reading', methods=['GET'])
-@jwt_required()
-def get_reading_memory():
-    """Get reading module memory only"""
-    try:
-        student_id = int(get_jwt_identity())
-        memory_service = get_memory_service()
-
-        reading_memory = memory_service.get_reading_memory(student_id)
-
-        return jsonify({
-            'success': True,
-            'reading_memory': reading_memory
-        }), 200
+        if etag:
+            response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.max_age = 5
 
-    except Exception as e:
-        logger.error(f"Error retrieving reading memory: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Failed to retrieve reading memory'
-        }), 500
-
-
-@bp.route('/listening', methods=['GET'])
-@jwt_required()
-def get_listening_memory():
-    """Get listening module memory only"""
-    try:
-        student_id = int(get_jwt_identity())
-        memory_service = get_memory_service()
-
-        listening_memory = memory_service.get_listening_memory(student_id)
-
-        return jsonify({
-            'success': True,
-            'listening_memory': listening_memory
-        }), 200
-
-    except Exception as e:
-        logger.error(f"Error retrieving listening memory: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Failed to retrieve listening memory'
-        }), 500
-
-
-@bp.route('/speaking', methods=['GET'])
-@jwt_required()
-def get_speaking_memory():
-    """Get speaking module memory only"""
-    try:
-        student_id = int(get_jwt_identity())
-        memory_service = get_memory_service()
-
-        speaking_memory = memory_service.get_speaking_memory(student_id)
-
-        return jsonify({
-            'success': True,
-            'speaking_memory': speaking_memory
-        }), 200
+        logger.info(f"Memory board retrieved for student {student_id}")
+        return response
 
-    except Exception as e:
-        logger.error(f"Error retrieving speaking memory: {str(e)}")
-        return jsonify({
+    except Exception:
+        logger.exception("Error retrieving memory board")
+        return json_response({
             'success': False,
-            'error': 'Failed to retrieve speaking memory'
-        }), 500
-
-
-@bp.route('/writing', methods=['GET'])
-@jwt_required()
-def get_writing_memory():
-    """Get writing module memory only"""
-    try:
-        student_id = int(get_jwt_identity())
-        memory_service = get_memory_service()
-
-        writing_memory = memory_service.get_writing_memory(student_id)
+            'error': 'Failed to retrieve memory board'
+        }, 500)
 
-        return jsonify({
-            'success': True,
-            'writing_memory': writing_memory
-        }), 200
 
-    except Exception as e:
-        logger.error(f"Error retrieving writing memory: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Failed to retrieve writing memory'
-        }), 500
+# Module name in the URL -> MemoryService getter for that module's memory
+MODULE_MEMORY_GETTERS = {
+    'reading': 'get_reading_memory',
+    'listening': 'get_listening_memory',
+    'speaking': 'get_speaking_memory',
+    'writing': 'get_writing_memory',
+    'conversation': 'get_conversation_memory',
+}
 
 
-@bp.route('/conversation', methods=['GET'])
+@bp.route(f"/<any({', '.join(MODULE_MEMORY_GETTERS)}):module>", methods=['GET'])
 @jwt_required()
-def get_conversation_memory():
-    """Get conversation module memory only"""
+def get_module_memory(module):
+    """Get a single module's memory (reading, listening, speaking, writing or conversation)"""
     try:
-        student_id = int(get_jwt_identity())
-        memory_service = get_memory_service()
-
-        conversation_memory = memory_service.get_conversation_memory(student_id)
+        student_id = current_user_id()
+        module_memory = getattr(_MEMORY_SERVICE, MODULE_MEMORY_GETTERS[module])(student_id)
 
-        return jsonify({
+        return json_response({
             'success': True,
-            'conversation_memory': conversation_memory
-        }), 200
+            f'{module}_memory': module_memory
+        })
 
-    except Exception as e:
-        logger.error(f"Error retrieving conversation memory: {str(e)}")
-        return jsonify({
+    except Exception:
+        logger.exception("Error retrieving %s memory", module)
+        return json_response({
             'success': False,
-            'error': 'Failed to retrieve conversation memory'
-        }), 500
+            'error': f'Failed to retrieve {module} memory'
+        }, 500)
@@ -8,6 +8,7 @@ from app.models.user import Student
 from app.models.session import LearningSession
 from app.api.azure_speech_client import AzureSpeechClient
 from app import db
+from app.utils import json_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -176,10 +177,10 @@ def get_word_pronunciation_history():
         student_id=user_id
     ).order_by(WordPronunciationHistory.last_practice_date.desc()).limit(50).all()
 
-    return jsonify({
-        'history': [h.to_dict() for h in history],
+    return json_response({
+        'history': [h.to_dict_raw() for h in history],
         'total_words_practiced': len(history)
-    }), 200
+    })
 
 @speaking_bp.route('/words/problem-areas', methods=['GET'])
 @jwt_required()
@@ -194,10 +195,10 @@ def get_problem_words():
         is_mastered=False
     ).order_by(WordPronunciationHistory.average_score).limit(20).all()
 
-    return jsonify({
-        'problem_words': [w.to_dict() for w in problem_words],
+    return json_response({
+        'problem_words': [w.to_dict_raw() for w in problem_words],
         'count': len(problem_words)
-    }), 200
+    })
 
 # ============ SENTENCE PRACTICE ENDPOINTS ============
 
@@ -816,10 +817,10 @@ def get_recent_speaking_sessions():
         student_id=user_id
     ).order_by(SpeakingSession.created_at.desc()).limit(limit).all()
 
-    return jsonify({
-        'sessions': [s.to_dict() for s in sessions],
+    return json_response({
+        'sessions': [s.to_dict_raw() for s in sessions],
         'count': len(sessions)
-    }), 200
+    })
 
 # ============ CHALLENGES ENDPOINTS ============
 
@@ -0,0 +1,74 @@
+"""
+Storage for per-user conversation contexts
+
+Contexts live in Redis when REDIS_URL is configured, so every worker process
+sees the same conversation and stale contexts expire on their own. Without
+Redis they are kept in a process-local dict with the same TTL semantics.
+"""
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import orjson
+
+
+class ConversationContextStore:
+    """Dict-like store of conversation contexts keyed by "user_<id>" """
+
+    # Context fields holding datetimes, restored after a JSON round-trip through Redis
+    DATETIME_FIELDS = ('session_start',)
+
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = 24 * 3600, prefix: str = 'conv:ctx:'):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local = {}  # key -> (expires_at, context), used when Redis is not configured
+        self._redis = None
+        if redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url)
+
+    def get(self, key: str, default: Any = None) -> Optional[Dict[str, Any]]:
+        if self._redis is not None:
+            raw = self._redis.get(self.prefix + key)
+            return self._decode(raw) if raw is not None else default
+
+        entry = self._local.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            # Another thread may have dropped the same expired entry already
+            self._local.pop(key, None)
+            return default
+        return entry[1]
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        context = self.get(key)
+        if context is None:
+            raise KeyError(key)
+        return context
+
+    def __setitem__(self, key: str, context: Dict[str, Any]):
+        # Every write refreshes the TTL, so only idle conversations expire
+        if self._redis is not None:
+            self._redis.set(self.prefix + key, orjson.dumps(context), ex=self.ttl)
+        else:
+            self._local[key] = (time.monotonic() + self.ttl, context)
+
+    def __delitem__(self, key: str):
+        if self._redis is not None:
+            if not self._redis.delete(self.prefix + key):
+                raise KeyError(key)
+        else:
+            del self._local[key]
+
+    def __contains__(self, key: str) -> bool:
+        if self._redis is not None:
+            return bool(self._redis.exists(self.prefix + key))
+        return self.get(key) is not None
+
+    def _decode(self, raw: bytes) -> Dict[str, Any]:
+        context = orjson.loads(raw)
+        for field in self.DATETIME_FIELDS:
+            if isinstance(context.get(field), str):
+                context[field] = datetime.fromisoformat(context[field])
+        return context
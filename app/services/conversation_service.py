@@ -1,27 +1,50 @@
 import json
+import os
+import shutil
+import tempfile
+import threading
 import time
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
+from flask import current_app
+from sqlalchemy import event
 from app.api.openai_client import OpenAIClient
 from app.api.heygen_client import HeyGenClient
 from app.api.azure_speech_client import AzureSpeechClient
+from app import db
+from app.models.session import ConversationSession
+from app.services.context_store import ConversationContextStore
 import logging
 
+logger = logging.getLogger(__name__)
+
 class ConversationService:
     """Service for handling avatar conversations and analysis"""
 
     # Class-level storage (shared across all instances)
-    _conversation_context = {}  # Persist across requests
+    _conversation_context = None  # ConversationContextStore, created on first use
     _streaming_sessions = {}  # Persist across requests
+    _history_cache = {}  # (user_id, limit, offset) -> (expires_at, page)
+    _history_fetches = {}  # user_id -> [fetches in flight, invalidations seen while in flight]
+    _history_lock = threading.Lock()
+
+    HISTORY_CACHE_TTL = 30  # seconds
+    HISTORY_CACHE_SIZE = 1024
 
     def __init__(self):
         self.openai_client = OpenAIClient()
         self.heygen_client = HeyGenClient()
         self.azure_speech_client = AzureSpeechClient()
         # Use class-level storage instead of instance-level
+        if ConversationService._conversation_context is None:
+            ConversationService._conversation_context = ConversationContextStore(
+                current_app.config.get('REDIS_URL'),
+                ttl=current_app.config.get('CONVERSATION_CONTEXT_TTL', 24 * 3600)
+            )
         self.conversation_context = ConversationService._conversation_context
         self.streaming_sessions = ConversationService._streaming_sessions
+        self._history_cache = ConversationService._history_cache
         
     def process_conversation(self, user_id: int, message: str, platform: str = 'text', pronunciation_data: Dict = None) -> Dict[str, Any]:
         """
@@ -39,8 +62,9 @@ class ConversationService:
         try:
             # Get or create conversation context
             context_key = f"user_{user_id}"
-            if context_key not in self.conversation_context:
-                self.conversation_context[context_key] = {
+            context = self.conversation_context.get(context_key)
+            if context is None:
+                context = {
                     'messages': [],
                     'session_start': datetime.now(),
                     'platform': platform,
@@ -53,7 +77,6 @@ class ConversationService:
                     }
                 }
 
-            context = self.conversation_context[context_key]
             context['user_id'] = user_id  # Ensure user_id is always present
 
             # Store pronunciation data if provided (from audio conversations)
@@ -85,6 +108,7 @@ class ConversationService:
                 'content': ai_response,
                 'timestamp': datetime.now().isoformat()
             })
+            self.conversation_context[context_key] = context
             
             # Prepare response data
             response_data = {
@@ -101,8 +125,8 @@ class ConversationService:
                 
             return response_data
             
-        except Exception as e:
-            logging.error(f"Conversation processing error: {str(e)}")
+        except Exception:
+            logger.exception("Conversation processing error")
             return {
                 'response': "I'm sorry, I'm having trouble understanding right now. Could you please try again?",
                 'conversation_id': f"user_{user_id}",
@@ -116,9 +140,9 @@ class ConversationService:
             user_id = context.get('user_id')
 
             # DEBUG LOGGING
-            logging.info(f"🔍 _generate_ai_response called")
-            logging.info(f"🔍 user_id from context: {user_id}")
-            logging.info(f"🔍 context keys: {context.keys()}")
+            logger.debug("🔍 _generate_ai_response called")
+            logger.debug("🔍 user_id from context: %s", user_id)
+            logger.debug("🔍 context keys: %s", context.keys())
 
             reading_memory = {}
             listening_memory = {}
@@ -133,37 +157,32 @@ class ConversationService:
                     memory_service = get_memory_service()
 
                     # Load memories from ALL 5 modules
-                    reading_memory = memory_service.get_reading_memory(user_id)
-                    listening_memory = memory_service.get_listening_memory(user_id)
-                    speaking_memory = memory_service.get_speaking_memory(user_id)
-                    writing_memory = memory_service.get_writing_memory(user_id)
-                    conversation_memory = memory_service.get_conversation_memory(user_id)
+                    (reading_memory, listening_memory, speaking_memory,
+                     writing_memory, conversation_memory) = memory_service.get_all_memories(user_id)
 
                     # DEBUG LOGGING
-                    logging.info(f"🔍 Memory loading results:")
-                    logging.info(f"   Reading: {'✅ HAS DATA' if reading_memory else '❌ EMPTY'}")
-                    logging.info(f"   Listening: {'✅ HAS DATA' if listening_memory else '❌ EMPTY'}")
-                    logging.info(f"   Speaking: {'✅ HAS DATA' if speaking_memory else '❌ EMPTY'}")
-                    logging.info(f"   Writing: {'✅ HAS DATA' if writing_memory else '❌ EMPTY'}")
-                    logging.info(f"   Conversation: {'✅ HAS DATA' if conversation_memory else '❌ EMPTY'}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("🔍 Memory loading results:")
+                        for name, memory in (('Reading', reading_memory), ('Listening', listening_memory),
+                                             ('Speaking', speaking_memory), ('Writing', writing_memory),
+                                             ('Conversation', conversation_memory)):
+                            logger.debug("   %s: %s", name, '✅ HAS DATA' if memory else '❌ EMPTY')
 
-                    if reading_memory:
-                        vocab_gaps = reading_memory.get('vocabulary_gaps', [])
-                        logging.info(f"   📚 Reading vocab gaps: {[v['word'] for v in vocab_gaps[:3]]}")
+                        if reading_memory:
+                            vocab_gaps = reading_memory.get('vocabulary_gaps', [])
+                            logger.debug("   📚 Reading vocab gaps: %s", [v['word'] for v in vocab_gaps[:3]])
 
                     memory_aware = any([reading_memory, listening_memory, speaking_memory,
                                        writing_memory, conversation_memory])
-                    logging.info(f"🔍 memory_aware: {memory_aware}")
-                except Exception as e:
-                    logging.error(f"Failed to load module memories: {str(e)}")
-                    import traceback
-                    logging.error(traceback.format_exc())
+                    logger.debug("🔍 memory_aware: %s", memory_aware)
+                except Exception:
+                    logger.exception("Failed to load module memories")
 
             # Build comprehensive memory context for Avatar from ALL modules
             memory_context = ""
             if memory_aware:
                 memory_context = "\n\n🧠 COMPLETE STUDENT HISTORY FROM ALL MODULES (YOU MUST USE THIS WHEN ASKED):"
-                logging.info(f"✅ Memory is being loaded for user {user_id}")
+                logger.info("✅ Memory is being loaded for user %s", user_id)
 
                 # === READING MODULE MEMORY ===
                 if reading_memory:
@@ -275,13 +294,10 @@ class ConversationService:
                     memory_context += f"\n\n🧠 OVERALL PATTERNS:\n   " + "\n   ".join(summaries[:3])
             else:
                 memory_context = "\n\n⚠️ NO LEARNING HISTORY AVAILABLE: This student hasn't completed any practice sessions yet. If they ask about their mistakes or struggles, politely tell them to complete some reading, speaking, or writing practice first so you can track their progress."
-                logging.warning(f"⚠️ No memory available for user {user_id}")
+                logger.warning("⚠️ No memory available for user %s", user_id)
 
             # DEBUGGING: Print the full memory context being sent to GPT
-            logging.info(f"=" * 80)
-            logging.info(f"🧠 MEMORY CONTEXT BEING SENT TO GPT:")
-            logging.info(memory_context)
-            logging.info(f"=" * 80)
+            logger.debug("%s\n🧠 MEMORY CONTEXT BEING SENT TO GPT:\n%s\n%s", "=" * 80, memory_context, "=" * 80)
 
             # Build conversation history for AI
             messages = [
@@ -357,8 +373,8 @@ Remember: The data below is REAL information from their learning sessions. Refer
             else:
                 return "That's interesting! Could you tell me more about that?"
                 
-        except Exception as e:
-            logging.error(f"AI response generation error: {str(e)}")
+        except Exception:
+            logger.exception("AI response generation error")
             return "I'd love to hear more about that! What do you think about it?"
     
     def _analyze_conversation_turn(self, user_message: str, ai_response: str) -> Dict[str, Any]:
@@ -381,27 +397,44 @@ Remember: The data below is REAL information from their learning sessions. Refer
         except:
             return {}
     
+    @staticmethod
+    def _spool_audio(audio_file) -> str:
+        """
+        Copy an uploaded audio file to a temporary file in 64 KiB chunks
+
+        Memory use stays bounded by the chunk size regardless of clip length.
+        The caller is responsible for removing the returned path.
+        """
+        suffix = os.path.splitext(audio_file.filename or '')[1] or '.wav'
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            shutil.copyfileobj(audio_file.stream, tmp, 64 * 1024)
+            return tmp.name
+
     def speech_to_text(self, audio_file, assess_pronunciation: bool = True) -> Dict[str, Any]:
         """
         Convert speech to text with pronunciation assessment
 
         Args:
-            audio_file: Audio file object
+            audio_file: Uploaded audio (werkzeug FileStorage); its stream is copied to a
+                temporary file in chunks rather than read into memory
             assess_pronunciation: Whether to assess pronunciation (default True)
 
         Returns:
             Dictionary with text, confidence, and pronunciation data
         """
+        audio_path = None
         try:
+            audio_path = self._spool_audio(audio_file)
+
             # Use Azure Speech Services for transcription + pronunciation
-            result = self.azure_speech_client.recognize_speech_from_file(audio_file)
+            result = self.azure_speech_client.recognize_speech_from_file(audio_path)
 
             pronunciation_data = {}
 
             if assess_pronunciation and result.get('text'):
                 # Assess pronunciation using Azure
                 pronunciation_result = self.azure_speech_client.assess_pronunciation(
-                    audio_file,
+                    audio_path,
                     reference_text=result.get('text', '')
                 )
 
@@ -443,14 +476,20 @@ Remember: The data below is REAL information from their learning sessions. Refer
                 'pronunciation_data': pronunciation_data
             }
 
-        except Exception as e:
-            logging.error(f"Speech-to-text error: {str(e)}")
+        except Exception:
+            logger.exception("Speech-to-text error")
             # Fallback to basic transcription without pronunciation
             return {
                 'text': "",
                 'confidence': 0.0,
                 'pronunciation_data': {}
             }
+        finally:
+            if audio_path:
+                try:
+                    os.unlink(audio_path)
+                except FileNotFoundError:
+                    pass
     
     def _generate_speech_audio(self, text: str) -> Optional[str]:
         """
@@ -487,11 +526,8 @@ Remember: The data below is REAL information from their learning sessions. Refer
                 memory_service = get_memory_service()
 
                 # Load all module memories
-                reading_memory = memory_service.get_reading_memory(user_id)
-                listening_memory = memory_service.get_listening_memory(user_id)
-                speaking_memory = memory_service.get_speaking_memory(user_id)
-                writing_memory = memory_service.get_writing_memory(user_id)
-                conversation_memory = memory_service.get_conversation_memory(user_id)
+                (reading_memory, listening_memory, speaking_memory,
+                 writing_memory, conversation_memory) = memory_service.get_all_memories(user_id)
 
                 # Generate personalized welcome based on any module memory
                 memory_hints = []
@@ -520,8 +556,8 @@ Remember: The data below is REAL information from their learning sessions. Refer
                     hint = memory_hints[0]
                     welcome_message = f"Welcome back! I remember we've been working on {hint}. Let's have a great conversation today!"
 
-            except Exception as e:
-                logging.error(f"Failed to load memory for welcome message: {str(e)}")
+            except Exception:
+                logger.exception("Failed to load memory for welcome message")
 
             # Initialize new session
             self.conversation_context[context_key] = {
@@ -549,8 +585,8 @@ Remember: The data below is REAL information from their learning sessions. Refer
                 'welcome_message': welcome_message
             }
             
-        except Exception as e:
-            logging.error(f"Start session error: {str(e)}")
+        except Exception:
+            logger.exception("Start session error")
             return {
                 'session_id': str(uuid.uuid4()),
                 'welcome_message': "Hello! Let's have a great conversation in English!"
@@ -561,11 +597,10 @@ Remember: The data below is REAL information from their learning sessions. Refer
         try:
             context_key = f"user_{user_id}"
             
-            if context_key not in self.conversation_context:
+            context = self.conversation_context.get(context_key)
+            if context is None:
                 return {'error': 'Session not found'}
             
-            context = self.conversation_context[context_key]
-            
             # Calculate session analytics
             total_messages = len([msg for msg in context['messages'] if msg['role'] == 'user'])
             total_words = sum(len(msg['content'].split()) for msg in context['messages'] if msg['role'] == 'user')
@@ -605,7 +640,7 @@ Remember: The data below is REAL information from their learning sessions. Refer
                     student_id=user_id,
                     session_data=session_data
                 )
-                logging.info(f"Extracted conversation memory insights for student {user_id}")
+                logger.info("Extracted conversation memory insights for student %s", user_id)
 
                 # Check if compression is needed
                 if memory_service.should_compress_conversation_memory(user_id):
@@ -613,38 +648,80 @@ Remember: The data below is REAL information from their learning sessions. Refer
                         student_id=user_id,
                         use_ai=True
                     )
-                    logging.info(f"Compressed conversation memory for student {user_id}")
+                    logger.info("Compressed conversation memory for student %s", user_id)
 
-            except Exception as e:
+            except Exception:
                 # Non-fatal: memory extraction failure shouldn't break the session
-                logging.error(f"Failed to extract/compress conversation memory: {str(e)}")
+                logger.exception("Failed to extract/compress conversation memory")
 
             # Clear session
             del self.conversation_context[context_key]
 
             return analytics
             
-        except Exception as e:
-            logging.error(f"End session error: {str(e)}")
+        except Exception:
+            logger.exception("End session error")
             return {'error': 'Failed to end session'}
     
     def get_user_history(self, user_id: int, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
-        """Get user's conversation history (placeholder)"""
+        """
+        Get user's conversation history, newest first
+
+        Pages are cached for HISTORY_CACHE_TTL seconds. Writing one of the user's
+        ConversationSession rows drops their cached pages, and a page fetched while
+        that user was invalidated is not stored.
+        """
         try:
-            # Placeholder implementation
-            # In production, this would query the database
-            return {
-                'conversations': [],
-                'total': 0,
-                'has_more': False
-            }
-        except Exception as e:
-            logging.error(f"Get history error: {str(e)}")
+            key = (user_id, limit, offset)
+            with self._history_lock:
+                cached = self._history_cache.get(key)
+                if cached and cached[0] > time.monotonic():
+                    return cached[1]
+                fetch = self._history_fetches.setdefault(user_id, [0, 0])
+                fetch[0] += 1
+                generation = fetch[1]
+
+            history = None
+            try:
+                query = ConversationSession.query.filter_by(student_id=user_id)
+                total = query.count()
+                sessions = (query.order_by(ConversationSession.started_at.desc())
+                            .offset(offset).limit(limit).all())
+
+                history = {
+                    'conversations': [session.to_dict() for session in sessions],
+                    'total': total,
+                    'has_more': offset + len(sessions) < total
+                }
+            finally:
+                with self._history_lock:
+                    fetch[0] -= 1
+                    if not fetch[0]:
+                        del self._history_fetches[user_id]
+                    if history is not None and generation == fetch[1]:
+                        self._history_cache.pop(key, None)
+                        # Drop the oldest entry once the cache is full (dicts keep insertion order)
+                        if len(self._history_cache) >= self.HISTORY_CACHE_SIZE:
+                            self._history_cache.pop(next(iter(self._history_cache)), None)
+                        self._history_cache[key] = (time.monotonic() + self.HISTORY_CACHE_TTL, history)
+            return history
+        except Exception:
+            logger.exception("Get history error")
             return {
                 'conversations': [],
                 'total': 0,
                 'has_more': False
             }
+
+    @classmethod
+    def _invalidate_user_history(cls, user_id: int):
+        """Drop the user's cached history pages and mark their in-flight fetches stale"""
+        with cls._history_lock:
+            fetch = cls._history_fetches.get(user_id)
+            if fetch is not None:
+                fetch[1] += 1
+            for key in [k for k in cls._history_cache if k[0] == user_id]:
+                del cls._history_cache[key]
     
     # ===================
     # STREAMING AVATAR CONVERSATION METHODS
@@ -697,22 +774,30 @@ Remember: The data below is REAL information from their learning sessions. Refer
             }
             
         except Exception as e:
-            logging.error(f"Start streaming conversation error: {str(e)}")
+            logger.exception("Start streaming conversation error")
             return {"error": f"Failed to start streaming conversation: {str(e)}"}
     
-    def process_streaming_message(self, session_key: str, user_message: str, audio_data: bytes = None) -> Dict[str, Any]:
-        """Process a message in streaming avatar conversation"""
+    def process_streaming_message(self, session_key: str, user_message: str, audio_file=None) -> Dict[str, Any]:
+        """
+        Process a message in streaming avatar conversation
+
+        Args:
+            session_key: Streaming session key
+            user_message: Text message (replaced by the transcription when audio is given)
+            audio_file: Optional uploaded audio (werkzeug FileStorage), spooled to disk
+                in chunks for transcription rather than read into memory
+        """
+        audio_path = None
         try:
             if session_key not in self.streaming_sessions:
                 return {"error": "Session not found"}
             
             session = self.streaming_sessions[session_key]
-            session_id = session['session_id']
-            user_id = session['user_id']
             
             # Transcribe audio if provided
-            if audio_data:
-                transcription_result = self.azure_speech_client.speech_to_text(audio_data)
+            if audio_file is not None:
+                audio_path = self._spool_audio(audio_file)
+                transcription_result = self.azure_speech_client.speech_to_text(audio_path)
                 if transcription_result.get('success'):
                     user_message = transcription_result.get('text', user_message)
                     pronunciation_score = transcription_result.get('pronunciation_score', 0)
@@ -724,114 +809,161 @@ Remember: The data below is REAL information from their learning sessions. Refer
             # Generate AI response using OpenAI
             ai_response = self._generate_enhanced_ai_response(user_message, session)
             
-            # Send response to HeyGen streaming avatar
-            heygen_result = self.heygen_client.handle_conversation_turn(
-                session_id, 
-                ai_response,
-                {"user_message": user_message, "user_id": user_id}
-            )
-            
-            if "error" in heygen_result:
-                return heygen_result
-            
-            # Record conversation turn
-            turn_data = {
-                'user_message': user_message,
-                'ai_response': ai_response,
-                'timestamp': datetime.now().isoformat(),
-                'pronunciation_score': pronunciation_score,
-                'analysis': heygen_result.get('conversation_analysis', {})
-            }
-            
-            session['messages'].append(turn_data)
-            session['analytics']['total_turns'] += 1
-            session['analytics']['total_words'] += len(user_message.split())
-            
-            # Update conversation context for continuity
-            context_key = f"user_{user_id}"
-            if context_key in self.conversation_context:
-                context = self.conversation_context[context_key]
-                context['messages'].extend([
-                    {'role': 'user', 'content': user_message, 'timestamp': datetime.now().isoformat()},
-                    {'role': 'assistant', 'content': ai_response, 'timestamp': datetime.now().isoformat()}
-                ])
-            
-            return {
-                'user_message': user_message,
-                'ai_response': ai_response,
-                'task_id': heygen_result.get('task_id'),
-                'pronunciation_score': pronunciation_score,
-                'conversation_analysis': heygen_result.get('conversation_analysis', {}),
-                'status': 'success'
-            }
+            return self._complete_streaming_turn(session, user_message, ai_response, pronunciation_score)
             
         except Exception as e:
-            logging.error(f"Process streaming message error: {str(e)}")
+            logger.exception("Process streaming message error")
             return {"error": f"Failed to process streaming message: {str(e)}"}
-    
-    def _generate_enhanced_ai_response(self, user_message: str, session: Dict) -> str:
-        """Generate enhanced AI response for streaming conversation with FULL MEMORY AWARENESS"""
-        try:
-            # === LOAD ALL MODULE MEMORIES FOR COMPREHENSIVE PERSONALIZATION ===
-            user_id = session.get('user_id')
-
-            reading_memory = {}
-            listening_memory = {}
-            speaking_memory = {}
-            writing_memory = {}
-            conversation_memory = {}
-            memory_aware = False
-
-            if user_id:
+        finally:
+            if audio_path:
                 try:
-                    from app.services.memory_service import get_memory_service
-                    memory_service = get_memory_service()
-
-                    # Load memories from ALL 5 modules
-                    reading_memory = memory_service.get_reading_memory(user_id)
-                    listening_memory = memory_service.get_listening_memory(user_id)
-                    speaking_memory = memory_service.get_speaking_memory(user_id)
-                    writing_memory = memory_service.get_writing_memory(user_id)
-                    conversation_memory = memory_service.get_conversation_memory(user_id)
-
-                    memory_aware = any([reading_memory, listening_memory, speaking_memory,
-                                       writing_memory, conversation_memory])
-                    logging.info(f"✅ Streaming conversation memory loaded for user {user_id}: {memory_aware}")
-                except Exception as e:
-                    logging.error(f"Failed to load module memories in streaming: {str(e)}")
-
-            # Build comprehensive memory context from ALL modules
-            memory_context = ""
-            if memory_aware:
-                memory_context = "\n\n🧠 COMPLETE STUDENT HISTORY (USE THIS DATA WHEN ASKED):"
-
-                # Reading memory
-                if reading_memory:
-                    vocab_gaps = reading_memory.get('vocabulary_gaps', [])
-                    if vocab_gaps:
-                        vocab_words = [v['word'] for v in vocab_gaps[:3]]
-                        memory_context += f"\n📚 READING - Vocabulary struggles: {', '.join(vocab_words)}"
-
-                # Speaking memory
-                if speaking_memory:
-                    chronic_mispron = speaking_memory.get('chronic_pronunciation_errors', [])
-                    if chronic_mispron:
-                        mispronounced = [w['word'] for w in chronic_mispron[:3]]
-                        memory_context += f"\n🗣️ SPEAKING - Pronunciation issues: {', '.join(mispronounced)}"
-
-                # Writing memory
-                if writing_memory:
-                    grammar_errors = writing_memory.get('chronic_grammar_errors', [])
-                    if grammar_errors:
-                        grammar_types = [e['error_type'] for e in grammar_errors[:2]]
-                        memory_context += f"\n✍️ WRITING - Grammar weaknesses: {', '.join(grammar_types)}"
+                    os.unlink(audio_path)
+                except FileNotFoundError:
+                    pass
+    
+    def stream_streaming_message(self, session_key: str, user_message: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process a text message in streaming avatar conversation, streaming the AI response
 
-            # Build context from session
-            topic = session.get('topic', 'general')
-            recent_messages = session.get('messages', [])[-10:]  # Last 5 exchanges
+        Yields {'token': text} for each piece of the completion as OpenAI produces it,
+        then a final dict: the same result process_streaming_message returns, or an error
+        """
+        session = self.streaming_sessions.get(session_key)
+        if session is None:
+            yield {"error": "Session not found"}
+            return
+        
+        tokens = []
+        try:
+            for token in self.openai_client.stream_content(
+                messages=self._build_enhanced_messages(user_message, session),
+                model="gpt-4",
+                max_tokens=150,
+                temperature=0.8
+            ):
+                tokens.append(token)
+                yield {'token': token}
+        except Exception:
+            logger.exception("Enhanced AI response streaming error")
+        
+        ai_response = ''.join(tokens)
+        if not ai_response:
+            ai_response = "I'd love to hear more about that! What do you think?"
+            yield {'token': ai_response}
+        
+        try:
+            yield self._complete_streaming_turn(session, user_message, ai_response)
+        except Exception as e:
+            logger.exception("Process streaming message error")
+            yield {"error": f"Failed to process streaming message: {str(e)}"}
+    
+    def _complete_streaming_turn(self, session: Dict, user_message: str, ai_response: str,
+                                 pronunciation_score: Optional[float] = None) -> Dict[str, Any]:
+        """Send the AI response to the HeyGen avatar and record the turn in the session and context"""
+        session_id = session['session_id']
+        user_id = session['user_id']
+        
+        # Send response to HeyGen streaming avatar
+        heygen_result = self.heygen_client.handle_conversation_turn(
+            session_id, 
+            ai_response,
+            {"user_message": user_message, "user_id": user_id}
+        )
+        
+        if "error" in heygen_result:
+            return heygen_result
+        
+        # Record conversation turn
+        turn_data = {
+            'user_message': user_message,
+            'ai_response': ai_response,
+            'timestamp': datetime.now().isoformat(),
+            'pronunciation_score': pronunciation_score,
+            'analysis': heygen_result.get('conversation_analysis', {})
+        }
+        
+        session['messages'].append(turn_data)
+        session['analytics']['total_turns'] += 1
+        session['analytics']['total_words'] += len(user_message.split())
+        
+        # Update conversation context for continuity
+        context_key = f"user_{user_id}"
+        context = self.conversation_context.get(context_key)
+        if context is not None:
+            context['messages'].extend([
+                {'role': 'user', 'content': user_message, 'timestamp': datetime.now().isoformat()},
+                {'role': 'assistant', 'content': ai_response, 'timestamp': datetime.now().isoformat()}
+            ])
+            self.conversation_context[context_key] = context
+        
+        return {
+            'user_message': user_message,
+            'ai_response': ai_response,
+            'task_id': heygen_result.get('task_id'),
+            'pronunciation_score': pronunciation_score,
+            'conversation_analysis': heygen_result.get('conversation_analysis', {}),
+            'status': 'success'
+        }
+    
+    def _build_enhanced_messages(self, user_message: str, session: Dict) -> List[Dict]:
+        """Build the memory-aware chat messages for a streaming conversation turn"""
+        # === LOAD ALL MODULE MEMORIES FOR COMPREHENSIVE PERSONALIZATION ===
+        user_id = session.get('user_id')
+
+        reading_memory = {}
+        listening_memory = {}
+        speaking_memory = {}
+        writing_memory = {}
+        conversation_memory = {}
+        memory_aware = False
+
+        if user_id:
+            try:
+                from app.services.memory_service import get_memory_service
+                memory_service = get_memory_service()
 
-            # Create enhanced system prompt with memory
-            system_prompt = f"""You are an experienced, encouraging English teacher having a streaming video conversation with a Chinese student (aged 16-20) through an AI avatar.
+                # Load memories from ALL 5 modules
+                (reading_memory, listening_memory, speaking_memory,
+                 writing_memory, conversation_memory) = memory_service.get_all_memories(user_id)
+
+                memory_aware = any([reading_memory, listening_memory, speaking_memory,
+                                   writing_memory, conversation_memory])
+                logger.info("✅ Streaming conversation memory loaded for user %s: %s", user_id, memory_aware)
+            except Exception:
+                logger.exception("Failed to load module memories in streaming")
+
+        # Build comprehensive memory context from ALL modules
+        memory_context = ""
+        if memory_aware:
+            memory_context = "\n\n🧠 COMPLETE STUDENT HISTORY (USE THIS DATA WHEN ASKED):"
+
+            # Reading memory
+            if reading_memory:
+                vocab_gaps = reading_memory.get('vocabulary_gaps', [])
+                if vocab_gaps:
+                    vocab_words = [v['word'] for v in vocab_gaps[:3]]
+                    memory_context += f"\n📚 READING - Vocabulary struggles: {', '.join(vocab_words)}"
+
+            # Speaking memory
+            if speaking_memory:
+                chronic_mispron = speaking_memory.get('chronic_pronunciation_errors', [])
+                if chronic_mispron:
+                    mispronounced = [w['word'] for w in chronic_mispron[:3]]
+                    memory_context += f"\n🗣️ SPEAKING - Pronunciation issues: {', '.join(mispronounced)}"
+
+            # Writing memory
+            if writing_memory:
+                grammar_errors = writing_memory.get('chronic_grammar_errors', [])
+                if grammar_errors:
+                    grammar_types = [e['error_type'] for e in grammar_errors[:2]]
+                    memory_context += f"\n✍️ WRITING - Grammar weaknesses: {', '.join(grammar_types)}"
+
+        # Build context from session
+        topic = session.get('topic', 'general')
+        recent_messages = session.get('messages', [])[-10:]  # Last 5 exchanges
+
+        # Create enhanced system prompt with memory
+        system_prompt = f"""You are an experienced, encouraging English teacher having a streaming video conversation with a Chinese student (aged 16-20) through an AI avatar.
 
 CONVERSATION TOPIC: {topic}
 
@@ -866,17 +998,24 @@ DO NOT be vague. USE THE ACTUAL DATA PROVIDED BELOW.
 
 Remember: This is a live video conversation - be natural, warm, and encouraging while using their learning history!"""
 
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add recent conversation history
-            for msg_data in recent_messages:
-                messages.extend([
-                    {"role": "user", "content": msg_data['user_message']},
-                    {"role": "assistant", "content": msg_data['ai_response']}
-                ])
-            
-            # Add current message
-            messages.append({"role": "user", "content": user_message})
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        # Add recent conversation history
+        for msg_data in recent_messages:
+            messages.extend([
+                {"role": "user", "content": msg_data['user_message']},
+                {"role": "assistant", "content": msg_data['ai_response']}
+            ])
+        
+        # Add current message
+        messages.append({"role": "user", "content": user_message})
+        
+        return messages
+    
+    def _generate_enhanced_ai_response(self, user_message: str, session: Dict) -> str:
+        """Generate enhanced AI response for streaming conversation with FULL MEMORY AWARENESS"""
+        try:
+            messages = self._build_enhanced_messages(user_message, session)
             
             # Generate response
             response = self.openai_client.generate_content(
@@ -894,8 +1033,8 @@ Remember: This is a live video conversation - be natural, warm, and encouraging
             else:
                 return "That's really interesting! Could you tell me more about that?"
                 
-        except Exception as e:
-            logging.error(f"Enhanced AI response generation error: {str(e)}")
+        except Exception:
+            logger.exception("Enhanced AI response generation error")
             return "I'd love to hear more about that! What do you think?"
     
     def stop_streaming_conversation(self, session_key: str) -> Dict[str, Any]:
@@ -914,6 +1053,9 @@ Remember: This is a live video conversation - be natural, warm, and encouraging
             # Calculate comprehensive analytics
             analytics = self._calculate_streaming_analytics(session)
             
+            if session['messages']:
+                self._persist_streaming_session(session, analytics)
+            
             # Clean up session
             del self.streaming_sessions[session_key]
             
@@ -929,9 +1071,48 @@ Remember: This is a live video conversation - be natural, warm, and encouraging
             }
             
         except Exception as e:
-            logging.error(f"Stop streaming conversation error: {str(e)}")
+            logger.exception("Stop streaming conversation error")
             return {"error": f"Failed to stop streaming conversation: {str(e)}"}
     
+    def _persist_streaming_session(self, session: Dict, analytics: Dict[str, Any]):
+        """Store a finished streaming conversation and its turns for the user's history"""
+        try:
+            # session_id is unique; never store the same HeyGen session twice
+            if ConversationSession.get_by_session_id(session['session_id']) is not None:
+                return
+            
+            # The in-memory session uses local time; the model stores UTC
+            utc_offset = datetime.utcnow() - datetime.now()
+            record = ConversationSession(
+                session_id=session['session_id'],
+                student_id=session['user_id'],
+                conversation_topic=session['topic'],
+                platform=session['platform'],
+                started_at=session['started_at'] + utc_offset
+            )
+            db.session.add(record)
+            db.session.flush()
+            
+            # All turns go in with one executemany instead of an INSERT per turn
+            record.flush_turns([
+                {
+                    'user_message': turn['user_message'],
+                    'ai_response': turn['ai_response'],
+                    'timestamp': datetime.fromisoformat(turn['timestamp']) + utc_offset,
+                    'analytics': {
+                        **(turn.get('analysis') or {}),
+                        'pronunciation_score': turn.get('pronunciation_score')
+                    }
+                }
+                for turn in session['messages']
+            ])
+            record.complete_session(analytics)
+            db.session.commit()
+        except Exception:
+            # Non-fatal: the user still gets their analytics if the history write fails
+            db.session.rollback()
+            logger.exception("Failed to store streaming conversation %s", session['session_id'])
+    
     def _calculate_streaming_analytics(self, session: Dict) -> Dict[str, Any]:
         """Calculate detailed analytics for streaming conversation"""
         try:
@@ -985,8 +1166,8 @@ Remember: This is a live video conversation - be natural, warm, and encouraging
                 )
             }
             
-        except Exception as e:
-            logging.error(f"Analytics calculation error: {str(e)}")
+        except Exception:
+            logger.exception("Analytics calculation error")
             return {'error': 'Failed to calculate analytics'}
     
     def _assess_vocabulary_complexity(self, messages: List[Dict]) -> int:
@@ -1128,5 +1309,13 @@ Remember: This is a live video conversation - be natural, warm, and encouraging
             }
             
         except Exception as e:
-            logging.error(f"Session status error: {str(e)}")
-            return {"error": f"Failed to get session status: {str(e)}"}
\ No newline at end of file
+            logger.exception("Session status error")
+            return {"error": f"Failed to get session status: {str(e)}"}
+
+
+@event.listens_for(ConversationSession, 'after_insert')
+@event.listens_for(ConversationSession, 'after_update')
+@event.listens_for(ConversationSession, 'after_delete')
+def _evict_cached_history(mapper, connection, conversation_session):
+    """Drop a student's cached history pages whenever one of their sessions is written"""
+    ConversationService._invalidate_user_history(conversation_session.student_id)
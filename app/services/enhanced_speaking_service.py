@@ -244,8 +244,9 @@ class EnhancedSpeakingService:
 
         db.session.add(speaking_session)
 
-        # Update word pronunciation history
+        # Update word pronunciation history; its statistics include this session
         self._update_word_history(student_id, target_word, pronunciation_score, problem_phonemes)
+        WordPronunciationHistory.recalculate_flagged(student_id=student_id, word=target_word)
 
         db.session.commit()
 
@@ -12,14 +12,16 @@ class ListeningService:
         self.heygen_client = HeyGenClient()
         self.openai_client = OpenAIClient()
     
-    def create_listening_session(self, student_id: int, topic: str = None) -> LearningSession:
+    def create_listening_session(self, student_id: int, topic: str = None, commit: bool = True) -> LearningSession:
         session = LearningSession(
             student_id=student_id,
             module_type='listening',
             activity_type='avatar_story'
         )
         db.session.add(session)
-        db.session.commit()
+        # Callers that fill in results right away pass commit=False and commit once themselves
+        if commit:
+            db.session.commit()
         return session
     
     def generate_avatar_content(self, topic: str, difficulty_level: str = 'intermediate') -> Dict:
@@ -15,6 +15,8 @@ for each student across all modules.
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
 from app import db
 from app.models.memory import (
     StudentMemoryBoard, ReadingMemoryInsight, ListeningMemoryInsight,
@@ -56,13 +58,68 @@ class MemoryService:
 
         return memory_board
 
+    def get_memory_board_for_display(self, student_id: int) -> StudentMemoryBoard:
+        """
+        Load the memory board for read-only display in one query.
+
+        Only the six memory columns and updated_at are loaded, leaving out the
+        compression timestamps and counters; a missing board is still created.
+        """
+        memory_board = db.session.execute(
+            select(StudentMemoryBoard)
+            .options(load_only(
+                StudentMemoryBoard.reading_memory,
+                StudentMemoryBoard.listening_memory,
+                StudentMemoryBoard.speaking_memory,
+                StudentMemoryBoard.writing_memory,
+                StudentMemoryBoard.conversation_memory,
+                StudentMemoryBoard.overall_patterns,
+                StudentMemoryBoard.updated_at
+            ))
+            .where(StudentMemoryBoard.student_id == student_id)
+        ).scalar_one_or_none()
+
+        if memory_board is None:
+            memory_board = self.get_or_create_memory_board(student_id)
+        return memory_board
+
+    def get_all_memories(self, student_id: int) -> Tuple[Dict, Dict, Dict, Dict, Dict]:
+        """
+        Get compressed memory for all five modules in one query.
+        Returns (reading, listening, speaking, writing, conversation) memory dicts.
+
+        Only the five memory columns are selected, and a student without a memory
+        board gets empty dicts instead of an INSERT + commit on this read path.
+        """
+        row = db.session.execute(
+            select(
+                StudentMemoryBoard.reading_memory,
+                StudentMemoryBoard.listening_memory,
+                StudentMemoryBoard.speaking_memory,
+                StudentMemoryBoard.writing_memory,
+                StudentMemoryBoard.conversation_memory
+            ).where(StudentMemoryBoard.student_id == student_id)
+        ).first()
+        if row is None:
+            return {}, {}, {}, {}, {}
+        return tuple(memory or {} for memory in row)
+
+    def _get_module_memory(self, student_id: int, column) -> Dict:
+        """
+        Select a single module's memory column for a student.
+        Like get_all_memories, a missing memory board reads as {} without creating one.
+        """
+        memory = db.session.execute(
+            select(column).where(StudentMemoryBoard.student_id == student_id)
+        ).scalar()
+        return memory or {}
+
     def get_reading_memory(self, student_id: int) -> Dict:
         """
         Get compressed reading memory for a student.
         Returns a dict with vocabulary gaps, comprehension weaknesses, etc.
         """
-        memory_board = self.get_or_create_memory_board(student_id)
-        return memory_board.reading_memory or {}
+        return self._get_module_memory(student_id, StudentMemoryBoard.reading_memory)
 
     def should_compress_reading_memory(self, student_id: int) -> bool:
         """Check if it's time to compress reading insights"""
@@ -469,8 +526,7 @@ class MemoryService:
         Get compressed listening memory for a student.
         Returns a dict with question type weaknesses, audio difficulty patterns, etc.
         """
-        memory_board = self.get_or_create_memory_board(student_id)
-        return memory_board.listening_memory or {}
+        return self._get_module_memory(student_id, StudentMemoryBoard.listening_memory)
 
     def should_compress_listening_memory(self, student_id: int) -> bool:
         """Check if it's time to compress listening insights"""
@@ -691,8 +747,7 @@ class MemoryService:
         Get compressed speaking memory for a student.
         Returns a dict with pronunciation patterns, phoneme errors, fluency issues.
         """
-        memory_board = self.get_or_create_memory_board(student_id)
-        return memory_board.speaking_memory or {}
+        return self._get_module_memory(student_id, StudentMemoryBoard.speaking_memory)
 
     def should_compress_speaking_memory(self, student_id: int) -> bool:
         """Check if it's time to compress speaking insights"""
@@ -1002,8 +1057,7 @@ class MemoryService:
         Get compressed writing memory for a student.
         Returns a dict with grammar patterns, style issues, vocabulary weaknesses.
         """
-        memory_board = self.get_or_create_memory_board(student_id)
-        return memory_board.writing_memory or {}
+        return self._get_module_memory(student_id, StudentMemoryBoard.writing_memory)
 
     def should_compress_writing_memory(self, student_id: int) -> bool:
         """Check if it's time to compress writing insights"""
@@ -1330,8 +1384,7 @@ class MemoryService:
         Get compressed conversation memory for a student.
         Returns a dict with grammar patterns, vocabulary gaps, topic struggles.
         """
-        memory_board = self.get_or_create_memory_board(student_id)
-        return memory_board.conversation_memory or {}
+        return self._get_module_memory(student_id, StudentMemoryBoard.conversation_memory)
 
     def should_compress_conversation_memory(self, student_id: int) -> bool:
         """Check if it's time to compress conversation insights"""
@@ -40,7 +40,7 @@ class ReadingChatbotService:
                 }
 
             # Get student info for personalization
-            student = Student.query.get(student_id)
+            student = db.session.get(Student, student_id)
 
             # === NEW: Load memory board ===
             from app.services.memory_service import get_memory_service
@@ -125,7 +125,7 @@ class ReadingChatbotService:
         """
         try:
             session = ReadingSession.query.get(reading_session_id)
-            student = Student.query.get(student_id)
+            student = db.session.get(Student, student_id)
             
             # Check if student has interacted with this word before
             previous_interaction = VocabularyInteraction.query.filter_by(
@@ -207,7 +207,7 @@ class ReadingChatbotService:
         """
         try:
             session = ReadingSession.query.get(reading_session_id)
-            student = Student.query.get(student_id)
+            student = db.session.get(Student, student_id)
             
             if not session:
                 return {
@@ -285,7 +285,7 @@ class ReadingChatbotService:
         """
         try:
             session = ReadingSession.query.get(reading_session_id)
-            student = Student.query.get(student_id)
+            student = db.session.get(Student, student_id)
             
             # Analyze current reading performance
             total_words = session.total_words_read or 0
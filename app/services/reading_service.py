@@ -591,7 +591,7 @@ class ReadingService:
         try:
             # Get student info for personalization
             from app.models.user import Student
-            student = Student.query.get(student_id)
+            student = db.session.get(Student, student_id)
             
             query = ReadingMaterial.query.filter_by(is_active=True)
             
@@ -26,7 +26,7 @@ class WritingService:
     
     def generate_writing_prompt(self, student_id: int, topic_type: str = 'creative') -> Dict:
         # Get student info for personalized prompts
-        student = Student.query.get(student_id)
+        student = db.session.get(Student, student_id)
         if not student:
             return {'error': 'Student not found'}
         
@@ -3,5 +3,10 @@ Utility modules for the language arts application
 """
 
 from .audio_converter import convert_webm_to_wav, ensure_wav_format, is_wav_format
+from .json_response import json_response, cacheable_response, OrjsonProvider
+from .auth_cache import current_user, current_user_id, role_required
+from .singleflight import SingleFlight
+from .metrics import METRICS
 
-__all__ = ['convert_webm_to_wav', 'ensure_wav_format', 'is_wav_format']
\ No newline at end of file
+__all__ = ['convert_webm_to_wav', 'ensure_wav_format', 'is_wav_format', 'json_response', 'cacheable_response', 'OrjsonProvider',
+           'current_user', 'current_user_id', 'role_required', 'SingleFlight', 'METRICS']
\ No newline at end of file
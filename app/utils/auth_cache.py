@@ -0,0 +1,59 @@
+"""
+Request-scoped caching of the authenticated user
+"""
+from functools import wraps
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from app import db
+from app.models.user import User
+
+
+def current_user_id() -> int:
+    """
+    Return the JWT identity as an int, parsed once per request
+
+    Tokens carry the identity as a string on purpose: PyJWT rejects a non-string
+    'sub' claim, so the conversion cannot move to token creation and is paid here
+    at most once per request instead.
+    """
+    identity = get_jwt_identity()
+    # g can outlive a request (e.g. an app context pushed around several test requests),
+    # so the cache is keyed on the identity it was built for
+    if g.get('_user_identity') != identity:
+        g._user_identity = identity
+        g._user_id = int(identity)
+        g.pop('_user', None)
+    return g._user_id
+
+
+def current_user():
+    """
+    Return the User for the JWT identity, loaded at most once per request
+
+    Returns:
+        User instance, or None if the user no longer exists
+    """
+    user_id = current_user_id()
+    if '_user' not in g:
+        g._user = db.session.get(User, user_id)
+    return g._user
+
+
+def role_required(user_type: str):
+    """
+    Require a valid JWT whose user_type claim matches, decoding it once per request
+
+    The decoded claims are left on g.jwt_claims and the identity on g.user_id,
+    so the view does not need to read the JWT again.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            g.jwt_claims = get_jwt()
+            if g.jwt_claims.get('user_type') != user_type:
+                return jsonify({'error': f'Access denied - {user_type}s only'}), 403
+            g.user_id = current_user_id()
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,66 @@
+"""
+Fast JSON responses backed by orjson
+"""
+import orjson
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """
+    Serialize payload with orjson and wrap it in a JSON Response
+
+    orjson encodes datetime objects natively, so payloads built from
+    ``to_dict_raw()`` can be passed as-is without ``isoformat()`` calls.
+
+    Args:
+        payload: Any orjson-serializable object
+        status: HTTP status code
+
+    Returns:
+        Flask Response with application/json mimetype
+    """
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+def cacheable_response(response: Response, max_age: int) -> Response:
+    """
+    Let the client cache a response privately and revalidate it with an ETag
+
+    Args:
+        response: Complete (non-streamed) response for the current request
+        max_age: Seconds the client may reuse the response without asking
+
+    Returns:
+        The response with Cache-Control and ETag set, or an empty 304 when the
+        request's If-None-Match already matches the body
+    """
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson, used by jsonify() and request.get_json()
+
+    datetime, UUID and dataclass values are encoded natively; anything else
+    orjson does not know falls back to Flask's default conversions.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._encode(obj).decode()
+
+    def response(self, *args, **kwargs) -> Response:
+        # orjson already produces UTF-8 bytes; hand them to the response as-is
+        # instead of decoding to str for Flask to encode again
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj), mimetype='application/json')
+
+    @staticmethod
+    def _encode(obj) -> bytes:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
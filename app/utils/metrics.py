@@ -0,0 +1,25 @@
+"""
+In-process event counters
+"""
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class Metrics:
+    """Named counters shared by all threads of a worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+METRICS = Metrics()
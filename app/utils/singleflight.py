@@ -0,0 +1,43 @@
+"""
+In-process request collapsing for concurrent identical fetches
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Share one call among concurrent callers using the same key
+
+    The first caller for a key runs the function in its own thread (so it keeps
+    the Flask app and request context); callers arriving while it is running
+    wait for and receive the same result, or the same exception. The key is
+    released as soon as the call finishes, so nothing is cached beyond it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
@@ -33,6 +33,23 @@ class Config:
     
     # Session Settings
     PERMANENT_SESSION_LIFETIME = 3600  # 1 hour
+    
+    # Response compression (flask-compress); streamed responses are compressed on the fly
+    COMPRESS_MIMETYPES = ['application/json', 'application/x-ndjson']
+    COMPRESS_LEVEL = 4
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_STREAMS = True
+    
+    # Conversation context store (Redis when configured, otherwise per-process memory)
+    REDIS_URL = os.environ.get('REDIS_URL')
+    CONVERSATION_CONTEXT_TTL = 24 * 3600  # 24 hours
+    MEMORY_CONTEXT_CACHE_TTL = 120  # seconds
+    LISTENING_MEMORY_CACHE_TTL = 60  # seconds
+    MEMORY_BOARD_CACHE_TTL = 5  # seconds
+    
+    # Listening audio: nginx internal location for X-Accel-Redirect (e.g. /_internal_audio/)
+    AUDIO_ACCEL_REDIRECT = os.environ.get('AUDIO_ACCEL_REDIRECT')
+    AUDIO_CACHE_MAX_AGE = 7 * 24 * 3600  # audio files never change in place
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,21 @@
+"""
+Gunicorn settings for serving the backend: gunicorn -c gunicorn.conf.py run:app
+
+Most request time is spent waiting on OpenAI, HeyGen and Azure Speech, so each
+worker runs a pool of threads; the GIL is released while a thread waits on the
+network, letting the other threads progress. gevent is deliberately not used:
+the Azure Speech SDK blocks inside its C extension and would stall the whole hub.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+
+# Streaming avatar sessions are kept in process memory, so several workers only
+# work behind a load balancer with sticky sessions; scale threads first
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+
+# Upstream AI calls can take tens of seconds; NDJSON responses stream for as long
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+keepalive = 5
@@ -2,6 +2,8 @@ import os
 from app import create_app, db
 from app.models.user import User, Student, Teacher
 from app.models.reading import ReadingMaterial, ReadingSession, VocabularyInteraction, ReadingProgress
+from app.models.memory import StudentMemoryBoard
+from app.models.speaking import WordPronunciationHistory
 from config import config
 
 app = create_app(config[os.environ.get('FLASK_ENV', 'development')])
@@ -50,5 +52,19 @@ def init_db():
         print("Student - username: student1, password: password123")
         print("Profile: 18 years old, intermediate English, targeting TOEFL/IELTS")
 
+@app.cli.command()
+def recalc_word_history():
+    """Recompute any word pronunciation statistics still flagged for recalculation."""
+    updated = WordPronunciationHistory.recalculate_flagged()
+    db.session.commit()
+    print(f"Recalculated {updated} word histories.")
+
+@app.cli.command()
+def backfill_memory_board():
+    """Replace NULL memory board columns with empty objects (run once on existing databases)."""
+    updated = StudentMemoryBoard.backfill_empty_memories()
+    db.session.commit()
+    print(f"Backfilled {updated} memory board columns.")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file